@@ -63,34 +63,44 @@ class LetterFreq:
         return f"{self.letter}:{self.frequency}"
 
 
-class memoized_property(object):
+class versioned_property(object):
     """
-    Decorator to create a memoized property that will be retreived
-    from cache if the class instance has not changed
+    Decorator to create a property that is cached on each class instance
+    and retrieved from cache until the instance's `_version` counter changes,
+    so classes using it must increment `_version` whenever they are mutated
     """
 
     def __init__(self, factory: Callable):
         self._factory = factory
-        self._value = None
-        self._cached_instance_hash = None
+        self._cache_name = f"_{factory.__name__}_cache"
+        self.hits = 0
+        self.misses = 0
+
+    def __set_name__(self, owner: type, name: str):
+        self._cache_name = f"_{name}_cache"
 
     def __get__(self, instance: object, owner: type):
-        instance_hash = instance.__hash__()
+        if instance is None:
+            return self
 
-        # Check if the instance has changed
-        if instance_hash != self._cached_instance_hash:
-            # Update the instance hash
-            self._cached_instance_hash = instance_hash
-            # Call the method to get the value
-            self._value = self._factory(instance)
+        # Check if the instance has changed since the value was cached
+        cached = instance.__dict__.get(self._cache_name)
+        if cached is not None and cached[0] == instance._version:
+            self.hits += 1
+            return cached[1]
 
-        return self._value
+        self.misses += 1
+        value = self._factory(instance)
+        instance.__dict__[self._cache_name] = (instance._version, value)
+        return value
 
 
 class Polymer:
     def __init__(self, polymer_string: str, rules: dict[str, str]):
         self.__polymer_string = polymer_string
         self.__rules = rules
+        # incremented whenever the polymer changes, to invalidate cached properties
+        self._version = 0
 
         # initialize pair frequencies
         self.__pair_frequencies = defaultdict(int)
@@ -106,6 +116,7 @@ class Polymer:
         Args:
             steps (int): Number of steps to advance the polymer.
         """
+        self._version += 1
         for _ in range(steps):
             # keep track of the frequency of each pair
             new_frequencies = defaultdict(int)
@@ -114,7 +125,7 @@ class Polymer:
                 new_frequencies[f"{self.__rules[pair]}{pair[1]}"] += freq
             self.__pair_frequencies = new_frequencies
 
-    @memoized_property
+    @versioned_property
     def letter_frequencies(self) -> dict[str, int]:
         """
         Returns the frequency of each letter in the polymer.
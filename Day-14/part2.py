@@ -8,8 +8,10 @@ Apply 40 steps of pair insertion to the polymer template and find the most and l
 """
 
 import os
+from array import array
 from collections import defaultdict
-from typing import Callable
+from operator import mul
+from typing import Callable, Iterator, Optional, Union
 
 
 class LetterFreq:
@@ -21,69 +23,234 @@ class LetterFreq:
         return f"{self.letter}:{self.frequency}"
 
 
-class memoized_property(object):
+class versioned_property(object):
     """
-    Decorator to create a memoized property that will be retreived
-    from cache if the class instance has not changed
+    Decorator to create a property that is cached on each class instance
+    and retrieved from cache until the instance's `_version` counter changes,
+    so classes using it must increment `_version` whenever they are mutated
     """
 
     def __init__(self, factory: Callable):
         self._factory = factory
-        self._value = None
-        self._cached_instance_hash = None
+        self._cache_name = f"_{factory.__name__}_cache"
+        self.hits = 0
+        self.misses = 0
+
+    def __set_name__(self, owner: type, name: str):
+        self._cache_name = f"_{name}_cache"
 
     def __get__(self, instance: object, owner: type):
-        instance_hash = instance.__hash__()
+        if instance is None:
+            return self
 
-        # Check if the instance has changed
-        if instance_hash != self._cached_instance_hash:
-            # Update the instance hash
-            self._cached_instance_hash = instance_hash
-            # Call the method to get the value
-            self._value = self._factory(instance)
+        # Check if the instance has changed since the value was cached
+        cached = instance.__dict__.get(self._cache_name)
+        if cached is not None and cached[0] == instance._version:
+            self.hits += 1
+            return cached[1]
 
-        return self._value
+        self.misses += 1
+        value = self._factory(instance)
+        instance.__dict__[self._cache_name] = (instance._version, value)
+        return value
 
 
 class Polymer:
     def __init__(self, polymer_string: str, rules: dict[str, str]):
         self.__polymer_string = polymer_string
         self.__rules = rules
+        # incremented whenever the polymer changes, to invalidate cached properties
+        self._version = 0
+        # when set, frequencies are only kept modulo this number
+        self.__modulus = None
+
+        # compile the rules into integer pair ids, with the ids of the two pairs
+        # each pair turns into, of its first letter and of the letter inserted in it
+        self.__pairs = sorted(rules)
+        self.__letters = sorted(set("".join(self.__pairs)) | set(polymer_string))
+        self.__pair_ids = pair_ids = {pair: i for i, pair in enumerate(self.__pairs)}
+        letter_ids = {letter: i for i, letter in enumerate(self.__letters)}
+        self.__left_children = []
+        self.__right_children = []
+        for pair in self.__pairs:
+            left, right = f"{pair[0]}{rules[pair]}", f"{rules[pair]}{pair[1]}"
+            assert left in pair_ids and right in pair_ids
+            self.__left_children.append(pair_ids[left])
+            self.__right_children.append(pair_ids[right])
+        self.__first_letters = [letter_ids[pair[0]] for pair in self.__pairs]
+        self.__inserted_letters = [letter_ids[rules[pair]] for pair in self.__pairs]
+        self.__last_letter = letter_ids[polymer_string[-1]]
 
         # initialize pair frequencies
-        self.__pair_frequencies = defaultdict(int)
+        self.__pair_frequencies = [0] * len(self.__pairs)
         for i in range(len(polymer_string) - 1):
             pair = polymer_string[i : i + 2]
             assert pair in rules
-            self.__pair_frequencies[pair] += 1
+            self.__pair_frequencies[pair_ids[pair]] += 1
 
-    def advance(self, steps: int = 1):
+    def advance(
+        self, steps: int = 1, method: str = "iterate", modulus: Optional[int] = None
+    ):
         """
         Advances the polymer by the given number of steps.
 
         Args:
             steps (int): Number of steps to advance the polymer.
+            method (str): "iterate" to apply the rules one step at a time, or
+                "matrix" to raise the pair transition matrix to the number of
+                steps by repeated squaring, for very large numbers of steps.
+            modulus (Optional[int]): If given, frequencies are only kept modulo
+                this number from now on, so they don't grow without bound.
         """
+        if modulus is not None:
+            if self.__modulus is not None and modulus != self.__modulus:
+                raise ValueError(
+                    f"Polymer frequencies are already modulo {self.__modulus}"
+                )
+            self.__modulus = modulus
+            self.__pair_frequencies = [
+                freq % modulus for freq in self.__pair_frequencies
+            ]
+        self._version += 1
+        if method == "matrix":
+            self.__advance_matrix(steps)
+            return
+        if method != "iterate":
+            raise ValueError(f"Unknown method: {method}")
+        left_children, right_children = self.__left_children, self.__right_children
         for _ in range(steps):
-            # keep track of the frequency of each pair
-            new_frequencies = defaultdict(int)
-            for pair, freq in self.__pair_frequencies.items():
-                new_frequencies[f"{pair[0]}{self.__rules[pair]}"] += freq
-                new_frequencies[f"{self.__rules[pair]}{pair[1]}"] += freq
+            # scatter the frequency of each pair onto the two pairs it turns into
+            new_frequencies = [0] * len(self.__pairs)
+            for pair_id, freq in enumerate(self.__pair_frequencies):
+                if freq:
+                    new_frequencies[left_children[pair_id]] += freq
+                    new_frequencies[right_children[pair_id]] += freq
+            if self.__modulus is not None:
+                new_frequencies = [freq % self.__modulus for freq in new_frequencies]
             self.__pair_frequencies = new_frequencies
 
-    @memoized_property
+    def advance_series(
+        self, steps: int, modulus: Optional[int] = None
+    ) -> Iterator[Union[array, list[int]]]:
+        """
+        Advances the polymer one step at a time, yielding the frequency of each
+        letter after each step, in the order of `letters`.
+
+        The letter frequencies are updated with the letters inserted at each step
+        rather than counted again from the pair frequencies.
+
+        Args:
+            steps (int): Number of steps to advance the polymer.
+            modulus (Optional[int]): If given, frequencies are only kept modulo
+                this number from now on, as for `advance`.
+
+        Yields:
+            Union[array, list[int]]: The frequency of each letter, as an unsigned
+                64-bit array if every frequency of the series is known to fit in
+                one, or else as a list for every step.
+        """
+        if modulus is not None:
+            self.advance(0, modulus=modulus)
+        counts = [0] * len(self.__letters)
+        for letter_id, freq in zip(self.__first_letters, self.__pair_frequencies):
+            counts[letter_id] += freq
+        counts[self.__last_letter] += 1
+        # pick one container for the whole series from the largest possible
+        # frequency: the length of the polymer after the last step, which grows
+        # to twice the number of pairs plus one at each step
+        if self.__modulus is not None:
+            largest = self.__modulus - 1
+        else:
+            largest = ((sum(counts) - 1) << steps) + 1
+        fits_array = largest < 2**64
+
+        for _ in range(steps):
+            # every pair gets its letter inserted as many times as it occurs
+            for letter_id, freq in zip(
+                self.__inserted_letters, self.__pair_frequencies
+            ):
+                counts[letter_id] += freq
+            if self.__modulus is not None:
+                counts = [count % self.__modulus for count in counts]
+            self.advance()
+            yield array("Q", counts) if fits_array else counts.copy()
+
+    @property
+    def letters(self) -> list[str]:
+        """
+        Returns the letters of the polymer and its rules, in the order used by
+        the frequencies from `advance_series`.
+
+        Returns:
+            list[str]: Sorted list of letters.
+        """
+        return list(self.__letters)
+
+    def __advance_matrix(self, steps: int):
+        """
+        Advances the polymer by multiplying the pair frequencies by the pair
+        transition matrix raised to the given number of steps.
+
+        Args:
+            steps (int): Number of steps to advance the polymer.
+        """
+        # transition[child][parent] is how many child pairs one parent pair makes
+        transition = [[0] * len(self.__pairs) for _ in self.__pairs]
+        for pair_id in range(len(self.__pairs)):
+            transition[self.__left_children[pair_id]][pair_id] += 1
+            transition[self.__right_children[pair_id]][pair_id] += 1
+        frequencies = self.__pair_frequencies
+
+        # apply the transition for each set bit of steps, squaring it in between
+        while steps:
+            if steps & 1:
+                frequencies = [
+                    self.__reduce(sum(map(mul, row, frequencies))) for row in transition
+                ]
+            steps >>= 1
+            if steps:
+                transition = self.__mat_mul(transition, transition)
+
+        self.__pair_frequencies = frequencies
+
+    def __mat_mul(self, a: list[list[int]], b: list[list[int]]) -> list[list[int]]:
+        """
+        Multiplies two square matrices, reducing by the modulus if there is one.
+
+        Args:
+            a (list[list[int]]): Left matrix.
+            b (list[list[int]]): Right matrix.
+
+        Returns:
+            list[list[int]]: The product of the matrices.
+        """
+        columns = list(zip(*b))
+        return [
+            [self.__reduce(sum(map(mul, row, column))) for column in columns]
+            for row in a
+        ]
+
+    def __reduce(self, value: int) -> int:
+        """Returns value modulo the modulus of the polymer, if it has one"""
+        return value if self.__modulus is None else value % self.__modulus
+
+    @versioned_property
     def letter_frequencies(self) -> dict[str, int]:
         """
-        Returns the frequency of each letter in the polymer.
+        Returns the frequency of each letter in the polymer, modulo the
+        modulus given to `advance` if there was one.
 
         Returns:
             dict[str, int]: Dictionary of letter frequencies.
         """
+        counts = [0] * len(self.__letters)
+        for letter_id, freq in zip(self.__first_letters, self.__pair_frequencies):
+            counts[letter_id] += freq
+        counts[self.__last_letter] += 1
         letter_frequencies = defaultdict(int)
-        for pair in self.__pair_frequencies:
-            letter_frequencies[pair[0]] += self.__pair_frequencies[pair]
-        letter_frequencies[self.__polymer_string[-1]] += 1
+        for letter, count in zip(self.__letters, counts):
+            if count:
+                letter_frequencies[letter] = self.__reduce(count)
         return letter_frequencies
 
     def most_common_letter(self) -> LetterFreq:
@@ -106,11 +273,90 @@ class Polymer:
         min_letter = min(self.letter_frequencies.items(), key=lambda x: x[1])
         return LetterFreq(letter=min_letter[0], frequency=min_letter[1])
 
+    def element_at(self, index: int, steps: int) -> str:
+        """
+        Returns the element at the given index of the polymer that the template
+        turns into after the given number of steps, without building it.
+
+        Args:
+            index (int): Index of the element, negative indices count from the end.
+            steps (int): Number of steps applied to the polymer template.
+
+        Returns:
+            str: The element at the index.
+        """
+        length = (len(self.__polymer_string) - 1) * (1 << steps) + 1
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("polymer index out of range")
+
+        # every pair of the template spans 2 ** steps gaps after the steps
+        gap, offset = divmod(index, 1 << steps)
+        if offset == 0:
+            return self.__polymer_string[gap]
+        pair_id = self.__pair_ids[self.__polymer_string[gap : gap + 2]]
+        # walk down the insertion tree, halving the span at each depth
+        half = 1 << (steps - 1)
+        while offset != half:
+            if offset < half:
+                pair_id = self.__left_children[pair_id]
+            else:
+                pair_id = self.__right_children[pair_id]
+                offset -= half
+            half >>= 1
+        return self.__pairs[self.__left_children[pair_id]][1]
+
+    def substring(self, start: int, stop: int, steps: int) -> str:
+        """
+        Returns the elements from start up to stop of the polymer that the template
+        turns into after the given number of steps, without building all of it.
+
+        Args:
+            start (int): Index of the first element, as for slicing.
+            stop (int): Index after the last element, as for slicing.
+            steps (int): Number of steps applied to the polymer template.
+
+        Returns:
+            str: The elements in the range.
+        """
+        pairs = len(self.__polymer_string) - 1
+        length = pairs * (1 << steps) + 1
+        start, stop, _ = slice(start, stop).indices(length)
+        elements = []
+        for gap in range(start >> steps, min((stop - 1) >> steps, pairs - 1) + 1):
+            base = gap << steps
+            if base >= start:
+                elements.append(self.__polymer_string[gap])
+            # visit the insertion tree of the pair in order, skipping the subtrees
+            # outside the range; nodes are (pair id, index of its first element,
+            # depth) and the elements inserted between them are plain strings
+            stack = [
+                (self.__pair_ids[self.__polymer_string[gap : gap + 2]], base, steps)
+            ]
+            while stack:
+                node = stack.pop()
+                if isinstance(node, str):
+                    elements.append(node)
+                    continue
+                pair_id, base, depth = node
+                if depth == 0 or base + (1 << depth) <= start or base + 1 >= stop:
+                    continue
+                middle = base + (1 << (depth - 1))
+                left_id = self.__left_children[pair_id]
+                stack.append((self.__right_children[pair_id], middle, depth - 1))
+                if start <= middle < stop:
+                    stack.append(self.__pairs[left_id][1])
+                stack.append((left_id, base, depth - 1))
+        if start < stop == length:
+            elements.append(self.__polymer_string[-1])
+        return "".join(elements)
+
     def __repr__(self):
         return self.__polymer_string
 
     def __hash__(self):
-        return hash(tuple(self.__pair_frequencies.items()))
+        return hash(tuple(self.__pair_frequencies))
 
     @classmethod
     def from_file(cls, file_path: str) -> "Polymer":
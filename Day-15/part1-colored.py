@@ -36,13 +36,18 @@ What is the lowest total risk of any path from the top left to the bottom right?
 """
 
 import os
+import sys
+from collections import Counter
 from dataclasses import dataclass
-from typing import Union
+from typing import Optional, TextIO, Union
 import time
 
 # pip install -U colored
 from colored import fg, bg, attr
 
+# colors representing medium blue, sky blue, teal, green, yellow, yellow-orange, orange, red-orange, red
+BACKGROUNDS = [25, 39, 6, 119, 3, 214, 166, 124]
+
 
 @dataclass
 class Tile:
@@ -55,6 +60,119 @@ class Tile:
     risk: int
 
 
+class HeatmapRenderer:
+    """
+    Class to animate a matrix of numbers as a colored heatmap in the terminal
+
+    Cells are updated as often as needed, but frames are only drawn at most
+    `fps` times per second and only the cells that look different from the
+    last frame are redrawn.
+    """
+
+    def __init__(
+        self,
+        height: int,
+        width: int,
+        fps: float = 30,
+        output: Optional[TextIO] = sys.stdout,
+    ):
+        """
+        Construct a renderer for a matrix where every cell starts as infinity
+
+        Args:
+            height (int): The number of rows in the matrix
+            width (int): The number of columns in the matrix
+            fps (float): The maximum number of frames to draw per second
+            output (Optional[TextIO]): Where to write the frames, or None to
+                only count the frames and bytes without writing them
+        """
+        self.height = height
+        self.width = width
+        self.fps = fps
+        self.output = output
+        self.frames = 0
+        self.bytes_written = 0
+        self._values: list[Union[int, float]] = [float("inf")] * (height * width)
+        # value and color of each cell as it was last drawn
+        self._drawn: list[Optional[tuple[Union[int, float], int]]] = [None] * (
+            height * width
+        )
+        self._dirty: set[int] = set(range(height * width))
+        # number of cells with each finite value, for keeping the bounds updated
+        self._value_counts: Counter = Counter()
+        self._min_num = self._max_num = 0
+        self._drawn_bounds = (0, 0)
+        self._last_frame_time = float("-inf")
+
+    def update(self, row: int, col: int, value: Union[int, float]):
+        """
+        Change the value of a cell and draw a frame if one is due
+
+        Args:
+            row (int): The row of the cell
+            col (int): The column of the cell
+            value (Union[int, float]): The new value of the cell
+        """
+        index = row * self.width + col
+        old_value = self._values[index]
+        self._values[index] = value
+        self._dirty.add(index)
+        if old_value != float("inf"):
+            self._value_counts[old_value] -= 1
+            if not self._value_counts[old_value]:
+                del self._value_counts[old_value]
+        if value != float("inf"):
+            self._value_counts[value] += 1
+        # only search for new bounds if a value at a bound has gone away
+        if not self._value_counts:
+            self._min_num = self._max_num = 0
+        else:
+            if value < self._min_num or self._min_num not in self._value_counts:
+                self._min_num = min(self._value_counts)
+            if value > self._max_num or self._max_num not in self._value_counts:
+                self._max_num = max(self._value_counts)
+        if time.perf_counter() - self._last_frame_time >= 1 / self.fps:
+            self.render()
+
+    def __color(self, num: Union[int, float]) -> int:
+        """Return the color of a finite number within the current bounds"""
+        if self._max_num == self._min_num:
+            return BACKGROUNDS[0]
+        scale = (num - self._min_num) / (self._max_num - self._min_num)
+        return BACKGROUNDS[int(scale * 7)]
+
+    def render(self):
+        """Draw the cells that have changed since the last frame"""
+        # when the bounds change, the color of any cell may have changed
+        bounds = (self._min_num, self._max_num)
+        cells = (
+            range(len(self._values)) if bounds != self._drawn_bounds else self._dirty
+        )
+        output = "\033[2J" if self.frames == 0 else ""
+        for index in sorted(cells):
+            num = self._values[index]
+            color = self.__color(num) if num != float("inf") else None
+            if self._drawn[index] == (num, color):
+                continue
+            self._drawn[index] = (num, color)
+            row, col = divmod(index, self.width)
+            output += f"\033[{row + 1};{col * 4 + 1}H"
+            if color is None:
+                output += "   ∞"
+            else:
+                output += f"{fg(color)}{num:>4}{attr('reset')}"
+        # leave the cursor below the heatmap
+        output += f"\033[{self.height + 1};1H"
+        self._dirty.clear()
+        self._drawn_bounds = bounds
+        self._last_frame_time = time.perf_counter()
+        self.frames += 1
+        self.bytes_written += len(output.encode())
+        if self.output is not None:
+            self.output.write(output)
+            self.output.flush()
+
+
 class RiskMap:
     """
     Class to represent a grid of tiles in the risk map for the cave
@@ -112,25 +230,28 @@ class RiskMap:
             neighbors.append(self._grid[row][col + 1])
         return neighbors
 
-    def min_cost(self, start: Tile, end: Tile) -> int:
+    def min_cost(
+        self, start: Tile, end: Tile, renderer: Optional[HeatmapRenderer] = None
+    ) -> int:
         """
         Find the lowest cost path from start to end using dynamic programming
 
         Args:
             start (Tile): The starting tile
             end (Tile): The ending tile
+            renderer (Optional[HeatmapRenderer]): A renderer to animate the
+                cost of each tile as the search runs
 
         Returns:
             int: The lowest cost path from start to end
         """
-        # clear screen
-        os.system("cls" if os.name == "nt" else "clear")
-
         # matrix for storing the lowest total risk to reach each tile
         cost = [[float("inf") for _ in range(self.width)] for _ in range(self.height)]
 
         # initialize the starting position to a cost of 0
         cost[start.row][start.col] = 0
+        if renderer is not None:
+            renderer.update(start.row, start.col, 0)
 
         # BFS to find the lowest cost to reach each tile
         queue = [start]
@@ -146,12 +267,12 @@ class RiskMap:
                 if neighbor_cost > cost_to_neighbor:
                     cost[neighbor.row][neighbor.col] = cost_to_neighbor
                     queue.append(neighbor)
-                    # set cursor position to the top left of the screen
-                    print(f"\033[{0};{0}H", end="")
-                    # print the risk map
-                    print(self.heatmap(cost))
-                    # add a delay
-                    time.sleep(0.1)
+                    if renderer is not None:
+                        renderer.update(neighbor.row, neighbor.col, cost_to_neighbor)
+
+        # draw the final costs
+        if renderer is not None:
+            renderer.render()
 
         # return the minimum cost to reach the end
         return cost[end.row][end.col]
@@ -159,8 +280,6 @@ class RiskMap:
     def heatmap(self, map: list[list[Union[int, float]]]) -> str:
         """Return a colored heatmap of a matrix, lowest numbers being blue, highest being red"""
         output = ""
-        # colors representing medium blue, sky blue, teal, green, yellow, yellow-orange, orange, red-orange, red
-        backgrounds = [25, 39, 6, 119, 3, 214, 166, 124]
         min_num = min(min(row) for row in map)
         max_num = max(
             max(num if num < float("inf") else min_num for num in row) for row in map
@@ -171,7 +290,7 @@ class RiskMap:
                 if num == float("inf"):
                     output += f"   ∞"
                     continue
-                color = backgrounds[int((num - min_num) / (max_num - min_num) * 7)]
+                color = BACKGROUNDS[int((num - min_num) / (max_num - min_num) * 7)]
                 output += f"{fg(color)}{num:>4}{attr('reset')}"
             output += "\n"
         return output
@@ -208,7 +327,12 @@ class RiskMap:
 def main():
     risk_map = RiskMap.from_file(os.path.join(os.path.dirname(__file__), "input2.txt"))
 
-    min_risk = risk_map.min_cost(risk_map[0, 0], risk_map[-1, -1])
+    # clear screen
+    os.system("cls" if os.name == "nt" else "clear")
+
+    renderer = HeatmapRenderer(risk_map.height, risk_map.width, fps=10)
+
+    min_risk = risk_map.min_cost(risk_map[0, 0], risk_map[-1, -1], renderer)
 
     print(f"  The lowest risk to reach the end is {min_risk}")
 
@@ -35,6 +35,7 @@ The total risk of this path is 40 (the starting position is never entered, so it
 What is the lowest total risk of any path from the top left to the bottom right?
 """
 
+import heapq
 import os
 from dataclasses import dataclass
 
@@ -63,6 +64,7 @@ class RiskMap:
             grid (list[list[Tile]]): A 2D matrix of tiles
         """
         self._grid = grid
+        self.nodes_settled = 0
 
     @property
     def height(self):
@@ -111,6 +113,8 @@ class RiskMap:
         """
         Find the lowest cost path from start to end using dynamic programming
 
+        The number of tiles taken from the queue is stored in `nodes_settled`.
+
         Args:
             start (Tile): The starting tile
             end (Tile): The ending tile
@@ -118,6 +122,8 @@ class RiskMap:
         Returns:
             int: The lowest cost path from start to end
         """
+        self.nodes_settled = 0
+
         # matrix for storing the lowest total risk to reach each tile
         cost = [[float("inf") for _ in range(self.width)] for _ in range(self.height)]
 
@@ -128,6 +134,7 @@ class RiskMap:
         queue = [start]
         while queue:
             current = queue.pop(0)
+            self.nodes_settled += 1
             for neighbor in self.neighbors(current):
                 # if the current best cost to reach the neighbor is greater than the
                 # cost to reach the current tile plus the risk of the neighbor,
@@ -142,6 +149,65 @@ class RiskMap:
         # return the minimum cost to reach the end
         return cost[end.row][end.col]
 
+    def min_cost_path(
+        self, start: Tile, end: Tile
+    ) -> tuple[int, list[tuple[int, int]]]:
+        """
+        Find the lowest cost path from start to end using A* search
+
+        Every step costs at least 1, so the Manhattan distance to the end never
+        overestimates the remaining cost and the search can stop as soon as
+        the end is settled. The number of tiles settled is stored in `nodes_settled`.
+
+        Args:
+            start (Tile): The starting tile
+            end (Tile): The ending tile
+
+        Returns:
+            tuple[int, list[tuple[int, int]]]: The lowest cost from start to end and
+                the row and column of each tile on the path, including both ends
+        """
+        self.nodes_settled = 0
+
+        # matrices for storing the lowest total risk found so far for each tile
+        # and the tile it was reached from
+        cost = [[float("inf") for _ in range(self.width)] for _ in range(self.height)]
+        previous = [[None for _ in range(self.width)] for _ in range(self.height)]
+        cost[start.row][start.col] = 0
+
+        # heap of (estimated total cost, cost, row, col)
+        distance = abs(end.row - start.row) + abs(end.col - start.col)
+        heap = [(distance, 0, start.row, start.col)]
+        while heap:
+            _, current_cost, row, col = heapq.heappop(heap)
+            # skip stale entries for tiles that were already reached more cheaply
+            if current_cost > cost[row][col]:
+                continue
+            self.nodes_settled += 1
+            # the first time the end is popped its cost is final
+            if row == end.row and col == end.col:
+                break
+            for neighbor in self.neighbors(self._grid[row][col]):
+                cost_to_neighbor = current_cost + neighbor.risk
+                if cost[neighbor.row][neighbor.col] > cost_to_neighbor:
+                    cost[neighbor.row][neighbor.col] = cost_to_neighbor
+                    previous[neighbor.row][neighbor.col] = self._grid[row][col]
+                    distance = abs(end.row - neighbor.row) + abs(end.col - neighbor.col)
+                    estimate = cost_to_neighbor + distance
+                    heapq.heappush(
+                        heap, (estimate, cost_to_neighbor, neighbor.row, neighbor.col)
+                    )
+        else:
+            # the end was not reachable from the start
+            return cost[end.row][end.col], []
+
+        # follow the previous tiles back from the end to rebuild the path
+        path = [end]
+        while path[-1] != start:
+            path.append(previous[path[-1].row][path[-1].col])
+        path.reverse()
+        return cost[end.row][end.col], [(tile.row, tile.col) for tile in path]
+
     def __repr__(self):
         """Display a grid of numbers with no spaces"""
         return "\n".join(
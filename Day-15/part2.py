@@ -127,8 +127,28 @@ The total risk of this path is 315 (the starting position is still never entered
 Using the full map, what is the lowest total risk of any path from the top left to the bottom right?
 """
 
+import heapq
+import mmap
 import os
+import tempfile
+from array import array
+from collections import OrderedDict, deque
 from dataclasses import dataclass
+from typing import Optional, Union
+
+# cost of a tile that has not been reached yet (largest 32-bit signed integer)
+UNREACHED = 2**31 - 1
+# cost of a tile that has not been reached yet in maps too big for 32-bit costs
+# (largest 64-bit signed integer)
+UNREACHED_64 = 2**63 - 1
+
+# translation table from the ASCII digits in the input file to their values
+DIGIT_VALUES = bytes.maketrans(b"0123456789", bytes(range(10)))
+
+# translation tables for increasing risk levels by 0 to 8, looping back to 1 above 9
+RISK_INCREASES = [
+    bytes((risk + k - 1) % 9 + 1 for risk in range(256)) for k in range(9)
+]
 
 
 @dataclass
@@ -142,27 +162,143 @@ class Tile:
     risk: int
 
 
+class MappedRisks:
+    """
+    Class to read risk levels directly from the digits of a memory-mapped file
+    """
+
+    def __init__(self, data: mmap.mmap, width: int, stride: int):
+        """
+        Construct a view of the risk levels in a mapped file
+
+        Args:
+            data (mmap.mmap): The mapped file containing rows of digits
+            width (int): The number of digits in each row
+            stride (int): The number of bytes from the start of one row to the
+                next, including the line ending
+        """
+        self._data = data
+        self._width = width
+        self._stride = stride
+        # the last row may not have a line ending
+        self._length = (len(data) + stride - width) // stride * width
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[int, bytes]:
+        """
+        Get the risk level at a flat index (row * width + col), or a slice of them
+
+        Args:
+            index (Union[int, slice]): The flat index of the tile or a slice of indices
+
+        Returns:
+            Union[int, bytes]: The risk level of the tile or the risk levels in the slice
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._length)
+            if step != 1:
+                return bytes(self[i] for i in range(start, stop, step))
+            if start >= stop:
+                return b""
+            # read the rows covering the slice at once and drop their line endings
+            first_row, last_row = start // self._width, (stop - 1) // self._width
+            rows = self._data[
+                first_row * self._stride : last_row * self._stride + self._width
+            ]
+            risks = rows.translate(DIGIT_VALUES, b"\r\n")
+            return risks[
+                start - first_row * self._width : stop - first_row * self._width
+            ]
+        if not 0 <= index < self._length:
+            raise IndexError(f"Risk index {index} is out of range")
+        row, col = divmod(index, self._width)
+        return self._data[row * self._stride + col] - ord("0")
+
+    def __setitem__(self, index: int, risk: int):
+        """
+        Change the risk level at a flat index (row * width + col)
+
+        Args:
+            index (int): The flat index of the tile
+            risk (int): The new risk level
+        """
+        row, col = divmod(index, self._width)
+        self._data[row * self._stride + col] = risk + ord("0")
+
+
+# buffers that risk levels can be stored in, in memory, in the mapped input file
+# or in a temporary file
+Risks = Union[bytearray, MappedRisks, memoryview]
+
+# arrays that costs can be stored in, in memory or backed by a temporary file
+IntArray = Union[array, memoryview]
+
+
+@dataclass
+class SearchTree:
+    """
+    Class to hold the result of a search from a starting tile to every tile,
+    so that it can be repaired when risk levels change
+    """
+
+    start: int
+    risks: Risks
+    cost: IntArray
+    previous: IntArray
+
+
 class RiskMap:
     """
     Class to represent a grid of tiles in the risk map for the cave
+
+    The risks are stored in a flat bytearray with one byte per tile,
+    indexed by row * width + col. Tiles are only created when requested.
     """
 
-    def __init__(self, grid: list[list[Tile]]):
+    def __init__(
+        self,
+        risks: Risks,
+        width: int,
+        max_cached_fields: int = 8,
+        file_backed: bool = False,
+    ):
         """
-        Construct a risk map from a matrix of tiles
+        Construct a risk map from a flat buffer of risk levels
 
         Args:
-            grid (list[list[Tile]]): A 2D matrix of tiles
+            risks (Risks): The risk level of each tile, row by row
+            width (int): The number of tiles in each row
+            max_cached_fields (int): The number of starting tiles to keep the
+                distance field of (see `distance_field`)
+            file_backed (bool): Whether to store the costs found by searches in
+                temporary files instead of in memory
         """
-        self._grid = grid
+        if width <= 0 or len(risks) % width != 0:
+            raise ValueError(f"{len(risks)} risk levels do not fit in rows of {width}")
+        self._risks = risks
+        self._height = len(risks) // width
+        self._width = width
+        # sizes of the grid before each expansion, from the first to the last
+        self._expansions: list[tuple[int, int]] = []
+        # risks of tiles in expanded areas that were changed by `update_risk`
+        self._changed_risks: dict[int, int] = {}
+        # search from a starting tile that is repaired by `update_risk`
+        self._plan: Optional[SearchTree] = None
+        # distance fields by flat index of the starting tile, least recently used first
+        self._distance_fields: OrderedDict[int, IntArray] = OrderedDict()
+        self.max_cached_fields = max_cached_fields
+        self.file_backed = file_backed
+        self.nodes_settled = 0
 
     @property
     def height(self):
-        return len(self._grid)
+        return self._height
 
     @property
     def width(self):
-        return len(self._grid[0])
+        return self._width
 
     def __getitem__(self, pos: tuple[int, int]) -> Tile:
         """
@@ -175,7 +311,40 @@ class RiskMap:
             Tile: The tile at the given position in the risk map
         """
         row, col = pos
-        return self._grid[row][col]
+        if row < 0:
+            row += self.height
+        if col < 0:
+            col += self.width
+        if not (0 <= row < self.height and 0 <= col < self.width):
+            raise IndexError(f"Position {pos} is outside of the risk map")
+        return Tile(row, col, self.__risk(row, col))
+
+    def __risk(self, row: int, col: int) -> int:
+        """
+        Get the risk level at a position that is known to be within the risk map
+
+        Risks in expanded areas of the map are not stored, but are calculated
+        from the original grid when requested.
+
+        Args:
+            row (int): The row of the tile
+            col (int): The column of the tile
+
+        Returns:
+            int: The risk level at the given position in the risk map
+        """
+        if not self._expansions:
+            return self._risks[row * self._width + col]
+        if row * self._width + col in self._changed_risks:
+            return self._changed_risks[row * self._width + col]
+        # undo the expansions from the last to the first, adding up how many
+        # copies away from the original grid the position is
+        offset = 0
+        for height, width in reversed(self._expansions):
+            offset += row // height + col // width
+            row, col = row % height, col % width
+        # risk loops around to 1 if it is greater than 9
+        return (self._risks[row * self._expansions[0][1] + col] + offset - 1) % 9 + 1
 
     def expand(self, times: int):
         """
@@ -187,21 +356,54 @@ class RiskMap:
         the risk levels are increased by 1 from the grid above or to the
         left of the copy. Risk levels above 9 loop back to 1.
 
+        The copies are not stored; the risk of a tile in the expanded grid
+        is calculated from the original grid whenever it is requested, so
+        the memory used does not grow with the expansion.
+
         Args:
             times (int): The number of times to expand the grid
         """
-        expanded_grid = [
-            [None for _ in range(self.width * times)]
-            for _ in range(self.height * times)
-        ]
-        for row in range(self.height * times):
-            for col in range(self.width * times):
-                cell_to_copy = self._grid[row % self.height][col % self.width]
-                offset = row // self.height + col // self.width
-                # risk loops around to 1 if it is greater than 9
-                risk = (cell_to_copy.risk + offset - 1) % 9 + 1
-                expanded_grid[row][col] = Tile(row, col, risk)
-        self._grid = expanded_grid
+        if self._changed_risks:
+            # changed risks are copied too, so store the grid as it is now
+            self._risks = self.__tile_risks()
+            self._expansions.clear()
+            self._changed_risks.clear()
+        self._expansions.append((self.height, self.width))
+        self._height *= times
+        self._width *= times
+        # the cached distances are for a grid that no longer exists
+        self._distance_fields.clear()
+        self._plan = None
+
+    def update_risk(self, row: int, col: int, risk: int):
+        """
+        Change the risk level of a tile
+
+        If a search was started with `plan`, only the part of it affected by
+        the change is searched again.
+
+        Args:
+            row (int): The row of the tile
+            col (int): The column of the tile
+            risk (int): The new risk level, between 1 and 9
+        """
+        if not 1 <= risk <= 9:
+            raise ValueError(f"Risk level must be between 1 and 9, got {risk}")
+        tile = self[row, col]
+        index = tile.row * self.width + tile.col
+        if self._expansions:
+            self._changed_risks[index] = risk
+        else:
+            self._risks[index] = risk
+        # the cached distances were found with the old risk
+        self._distance_fields.clear()
+        self.nodes_settled = 0
+        if self._plan is not None and tile.risk != risk:
+            self._plan.risks[index] = risk
+            if risk < tile.risk:
+                self.__repair_decrease(index)
+            else:
+                self.__repair_increase(index)
 
     def neighbors(self, tile: Tile) -> list[Tile]:
         """
@@ -214,79 +416,685 @@ class RiskMap:
             list[Tile]: The neighbors of the given tile
         """
         neighbors = []
-        row, col = tile.row, tile.col
+        for index in self.__neighbor_indices(tile.row * self.width + tile.col):
+            row, col = divmod(index, self.width)
+            neighbors.append(Tile(row, col, self.__risk(row, col)))
+        return neighbors
+
+    @property
+    def unreached(self) -> int:
+        """
+        The cost of a tile that has not been reached yet in the arrays made by
+        searches, which is `UNREACHED_64` if the map is too big for 32-bit costs
+        """
+        # a path can enter every tile but the start, at a risk of at most 9 each
+        if 9 * (self.height * self.width - 1) >= UNREACHED:
+            return UNREACHED_64
+        return UNREACHED
+
+    def __new_cost_array(self) -> IntArray:
+        """Create an array of costs with every tile unreached"""
+        unreached = self.unreached
+        return self.__new_array(unreached, "i" if unreached == UNREACHED else "q")
+
+    def __new_previous_array(self) -> IntArray:
+        """Create an array of the tile each tile was reached from, -1 for none"""
+        # flat indices do not fit in 32 bits in maps of more than 2**31 tiles
+        return self.__new_array(-1, "q")
+
+    def __new_array(self, fill: int, typecode: str) -> IntArray:
+        """
+        Create an array of integers with one item per tile
+
+        If the risk map is file backed, the array is stored in a temporary file
+        that is mapped into memory, so it does not need to fit in memory.
+
+        Args:
+            fill (int): The initial value of every item
+            typecode (str): The array typecode of the items, "i" for 32-bit or
+                "q" for 64-bit integers
+
+        Returns:
+            IntArray: The array of integers
+        """
+        size = self.height * self.width
+        if not self.file_backed:
+            return array(typecode, [fill]) * size
+        chunk = array(typecode, [fill]) * min(size, 2**20)
+        with tempfile.TemporaryFile() as f:
+            for _ in range(size // len(chunk)):
+                chunk.tofile(f)
+            chunk[: size % len(chunk)].tofile(f)
+            f.flush()
+            # the mapping stays valid after the file is closed
+            data = mmap.mmap(f.fileno(), size * chunk.itemsize)
+        return memoryview(data).cast(typecode)
+
+    def __neighbor_indices(self, index: int) -> list[int]:
+        """
+        Get the flat indices of the neighbors of a tile
+
+        Args:
+            index (int): The flat index of the tile (row * width + col)
+
+        Returns:
+            list[int]: The flat indices of the neighbors of the tile
+        """
+        width = self._width
+        row, col = divmod(index, width)
+        neighbors = []
         if row > 0:
-            neighbors.append(self._grid[row - 1][col])
-        if row < self.height - 1:
-            neighbors.append(self._grid[row + 1][col])
+            neighbors.append(index - width)
+        if row < self._height - 1:
+            neighbors.append(index + width)
         if col > 0:
-            neighbors.append(self._grid[row][col - 1])
-        if col < self.width - 1:
-            neighbors.append(self._grid[row][col + 1])
+            neighbors.append(index - 1)
+        if col < width - 1:
+            neighbors.append(index + 1)
         return neighbors
 
-    def min_cost(self, start: Tile, end: Tile) -> int:
+    def __tile_risks(self) -> Risks:
         """
-        Find the lowest cost path from start to end using dynamic programming
+        Get the risk level of every tile of the (possibly expanded) map as a flat buffer
+
+        This is only one byte per tile, so it is used by the searches to avoid
+        calculating the risk of tiles in expanded areas multiple times. If the
+        risk map is file backed, the expanded grid is written to a temporary
+        file that is mapped into memory, so it does not need to fit in memory.
+
+        Returns:
+            Risks: The risk level of each tile, row by row
+        """
+        if not self._expansions:
+            return self._risks
+        risks = self._risks
+        height, width = self._expansions[0]
+        # build each expansion from the previous one a row of a copy at a time
+        for new_height, new_width in [*self._expansions[1:], (self.height, self.width)]:
+            if self.file_backed:
+                f = tempfile.TemporaryFile()
+                write = f.write
+            else:
+                expanded = bytearray()
+                write = expanded.extend
+            for copy_row in range(new_height // height):
+                for row in range(height):
+                    line = bytes(risks[row * width : (row + 1) * width])
+                    for copy_col in range(new_width // width):
+                        write(line.translate(RISK_INCREASES[(copy_row + copy_col) % 9]))
+            if self.file_backed:
+                with f:
+                    f.flush()
+                    # the mapping stays valid after the file is closed
+                    expanded = memoryview(mmap.mmap(f.fileno(), new_height * new_width))
+            risks, height, width = expanded, new_height, new_width
+        for index, risk in self._changed_risks.items():
+            risks[index] = risk
+        return risks
+
+    def min_cost(self, start: Tile, end: Tile, method: str = "bfs") -> int:
+        """
+        Find the lowest cost path from start to end
+
+        The number of tiles that were settled by the search is stored in
+        `nodes_settled` so that the methods can be compared.
+
+        Args:
+            start (Tile): The starting tile
+            end (Tile): The ending tile
+            method (str): The search to use, one of "bfs" (repeated relaxation
+                with a FIFO queue), "dijkstra" (binary heap), "dial" (bucket
+                queue, relies on risks being between 1 and 9), "astar"
+                (binary heap guided by the distance to the end) or
+                "bidirectional" (binary heaps from both the start and the end)
+
+        Returns:
+            int: The lowest cost path from start to end
+        """
+        start_index = start.row * self.width + start.col
+        end_index = end.row * self.width + end.col
+        if method == "bfs":
+            return self.__bfs(start_index, end_index)
+        if method == "dijkstra":
+            return self.__dijkstra(start_index, end_index)
+        if method == "dial":
+            return self.__dial(start_index, end_index)[end_index]
+        if method == "astar":
+            return self.__astar(start_index, end_index)[0]
+        if method == "bidirectional":
+            return self.__bidirectional(start_index, end_index)
+        raise ValueError(f"Unknown method: {method}")
+
+    def distance_field(self, start: Tile) -> memoryview:
+        """
+        Get the lowest cost from start to every tile in the risk map
+
+        The fields of the most recently used starting tiles are cached, so
+        asking for the same start again does not repeat the search. The cache
+        is cleared whenever the grid changes.
+
+        Args:
+            start (Tile): The starting tile
+
+        Returns:
+            memoryview: A read-only view of the lowest cost to reach each tile,
+                indexed by row * width + col, so the cached field cannot be changed
+        """
+        start_index = start.row * self.width + start.col
+        if start_index in self._distance_fields:
+            self._distance_fields.move_to_end(start_index)
+            field = self._distance_fields[start_index]
+        else:
+            field = self.__dial(start_index)
+            self._distance_fields[start_index] = field
+            # forget the least recently used fields if there are too many
+            while len(self._distance_fields) > self.max_cached_fields:
+                self._distance_fields.popitem(last=False)
+        return memoryview(field).toreadonly()
+
+    def cached_min_cost(self, start: Tile, end: Tile) -> int:
+        """
+        Find the lowest cost path from start to end using the distance field of start
+
+        Only the first query from a starting tile runs a search; later queries
+        from the same start are a lookup in its cached distance field.
+
+        Args:
+            start (Tile): The starting tile
+            end (Tile): The ending tile
+
+        Returns:
+            int: The lowest cost path from start to end
+        """
+        return self.distance_field(start)[end.row * self.width + end.col]
+
+    def min_costs(self, queries: list[tuple[Tile, Tile]]) -> list[int]:
+        """
+        Find the lowest cost paths for many pairs of starting and ending tiles
+
+        The queries are grouped by starting tile so that each distance field
+        is computed once, even if the groups do not all fit in the cache.
+
+        Args:
+            queries (list[tuple[Tile, Tile]]): Pairs of starting and ending tiles
+
+        Returns:
+            list[int]: The lowest cost of each query, in the same order as the queries
+        """
+        by_start: dict[int, list[int]] = {}
+        for i, (start, _) in enumerate(queries):
+            by_start.setdefault(start.row * self.width + start.col, []).append(i)
+        costs = [0] * len(queries)
+        for indices in by_start.values():
+            field = self.distance_field(queries[indices[0]][0])
+            for i in indices:
+                end = queries[i][1]
+                costs[i] = field[end.row * self.width + end.col]
+        return costs
+
+    def plan(self, start: Tile):
+        """
+        Find the lowest cost from start to every tile and keep the search
+        so that it can be repaired by `update_risk`
 
         Args:
             start (Tile): The starting tile
+        """
+        start_index = start.row * self.width + start.col
+        self._plan = SearchTree(
+            start=start_index,
+            # the plan is dropped by `expand`, and `update_risk` changes these
+            # risks along with the map's, so they do not need to be copied
+            risks=self.__tile_risks(),
+            cost=self.__new_cost_array(),
+            previous=self.__new_previous_array(),
+        )
+        self._plan.cost[start_index] = 0
+        self.nodes_settled = 0
+        self.__propagate([(0, start_index)])
+
+    def planned_min_cost(self, end: Tile) -> int:
+        """
+        Find the lowest cost path to end from the start given to `plan`
+
+        Args:
             end (Tile): The ending tile
 
+        Returns:
+            int: The lowest cost path from the planned start to end
+        """
+        if self._plan is None:
+            raise ValueError("No search has been planned, call plan() first")
+        return self._plan.cost[end.row * self.width + end.col]
+
+    def __propagate(self, heap: list[tuple[int, int]]):
+        """
+        Continue the planned search until every tile reachable from the tiles
+        in the heap has its lowest cost
+
+        Args:
+            heap (list[tuple[int, int]]): A heap of (cost, index) of tiles whose
+                cost has changed
+        """
+        risks, cost, previous = self._plan.risks, self._plan.cost, self._plan.previous
+        heapq.heapify(heap)
+        while heap:
+            current_cost, current = heapq.heappop(heap)
+            # skip stale entries for tiles that were already reached more cheaply
+            if current_cost > cost[current]:
+                continue
+            self.nodes_settled += 1
+            for neighbor in self.__neighbor_indices(current):
+                cost_to_neighbor = current_cost + risks[neighbor]
+                if cost[neighbor] > cost_to_neighbor:
+                    cost[neighbor] = cost_to_neighbor
+                    previous[neighbor] = current
+                    heapq.heappush(heap, (cost_to_neighbor, neighbor))
+
+    def __repair_decrease(self, index: int):
+        """
+        Repair the planned search after the risk of a tile was lowered
+
+        Only the tile itself can get a cheaper path directly, and any tiles
+        that become cheaper are reached through it by the search.
+
+        Args:
+            index (int): The flat index of the tile whose risk was lowered
+        """
+        risks, cost, previous = self._plan.risks, self._plan.cost, self._plan.previous
+        if index == self._plan.start:
+            return
+        for neighbor in self.__neighbor_indices(index):
+            if cost[neighbor] + risks[index] < cost[index]:
+                cost[index] = cost[neighbor] + risks[index]
+                previous[index] = neighbor
+        self.__propagate([(cost[index], index)])
+
+    def __repair_increase(self, index: int):
+        """
+        Repair the planned search after the risk of a tile was raised
+
+        Only the tiles whose lowest cost path went through the tile can get
+        more expensive. They are reset and given the best cost through their
+        unaffected neighbors, then the search continues from there.
+
+        Args:
+            index (int): The flat index of the tile whose risk was raised
+        """
+        risks, cost, previous = self._plan.risks, self._plan.cost, self._plan.previous
+        if index == self._plan.start:
+            return
+        unreached = self.unreached
+        # find the tiles that were reached through the changed tile
+        affected = [index]
+        affected_set = {index}
+        for current in affected:
+            for neighbor in self.__neighbor_indices(current):
+                if previous[neighbor] == current and neighbor not in affected_set:
+                    affected.append(neighbor)
+                    affected_set.add(neighbor)
+        for tile in affected:
+            cost[tile] = unreached
+            previous[tile] = -1
+        # reconnect them to the tiles that were not affected
+        heap = []
+        for tile in affected:
+            for neighbor in self.__neighbor_indices(tile):
+                if neighbor in affected_set or cost[neighbor] == unreached:
+                    continue
+                if cost[neighbor] + risks[tile] < cost[tile]:
+                    cost[tile] = cost[neighbor] + risks[tile]
+                    previous[tile] = neighbor
+            if cost[tile] != unreached:
+                heap.append((cost[tile], tile))
+        self.__propagate(heap)
+
+    def min_cost_path(
+        self, start: Tile, end: Tile
+    ) -> tuple[int, list[tuple[int, int]]]:
+        """
+        Find the lowest cost path from start to end and the tiles along it
+
+        The number of tiles that were settled by the search is stored in
+        `nodes_settled`.
+
+        Args:
+            start (Tile): The starting tile
+            end (Tile): The ending tile
+
+        Returns:
+            tuple[int, list[tuple[int, int]]]: The lowest cost from start to end and
+                the row and column of each tile on the path, including both ends
+        """
+        start_index = start.row * self.width + start.col
+        end_index = end.row * self.width + end.col
+        cost, path = self.__astar(start_index, end_index)
+        return cost, [divmod(index, self.width) for index in path]
+
+    def __bfs(self, start: int, end: int) -> int:
+        """
+        Find the lowest cost path from start to end using dynamic programming
+
+        Args:
+            start (int): The flat index of the starting tile
+            end (int): The flat index of the ending tile
+
         Returns:
             int: The lowest cost path from start to end
         """
-        # matrix for storing the lowest total risk to reach each tile
-        cost = [[float("inf") for _ in range(self.width)] for _ in range(self.height)]
+        self.nodes_settled = 0
+        risks = self.__tile_risks()
+
+        # array for storing the lowest total risk to reach each tile
+        cost = self.__new_cost_array()
 
         # initialize the starting position to a cost of 0
-        cost[start.row][start.col] = 0
+        cost[start] = 0
 
         # BFS to find the lowest cost to reach each tile
-        queue = [start]
+        queue = deque([start])
         while queue:
-            current = queue.pop(0)
-            for neighbor in self.neighbors(current):
+            current = queue.popleft()
+            self.nodes_settled += 1
+            for neighbor in self.__neighbor_indices(current):
                 # if the current best cost to reach the neighbor is greater than the
                 # cost to reach the current tile plus the risk of the neighbor,
                 # update the cost to reach the neighbor to the new minimum cost
                 # and add the neighbor to the queue
-                neighbor_cost = cost[neighbor.row][neighbor.col]
-                cost_to_neighbor = cost[current.row][current.col] + neighbor.risk
-                if neighbor_cost > cost_to_neighbor:
-                    cost[neighbor.row][neighbor.col] = cost_to_neighbor
+                cost_to_neighbor = cost[current] + risks[neighbor]
+                if cost[neighbor] > cost_to_neighbor:
+                    cost[neighbor] = cost_to_neighbor
                     queue.append(neighbor)
 
         # return the minimum cost to reach the end
-        return cost[end.row][end.col]
+        return cost[end]
+
+    def __dijkstra(self, start: int, end: int) -> int:
+        """
+        Find the lowest cost path from start to end using Dijkstra's algorithm
+        with a binary heap as the priority queue
+
+        Args:
+            start (int): The flat index of the starting tile
+            end (int): The flat index of the ending tile
+
+        Returns:
+            int: The lowest cost path from start to end
+        """
+        self.nodes_settled = 0
+        risks = self.__tile_risks()
+
+        # array for storing the lowest total risk found so far for each tile
+        cost = self.__new_cost_array()
+        cost[start] = 0
+
+        # heap of (cost, index) so the cheapest tile is always popped first
+        heap = [(0, start)]
+        while heap:
+            current_cost, current = heapq.heappop(heap)
+            # skip stale entries for tiles that were already reached more cheaply
+            if current_cost > cost[current]:
+                continue
+            self.nodes_settled += 1
+            # the first time the end is popped its cost is final
+            if current == end:
+                return current_cost
+            for neighbor in self.__neighbor_indices(current):
+                cost_to_neighbor = current_cost + risks[neighbor]
+                if cost[neighbor] > cost_to_neighbor:
+                    cost[neighbor] = cost_to_neighbor
+                    heapq.heappush(heap, (cost_to_neighbor, neighbor))
+
+        # the end was not reachable from the start
+        return cost[end]
+
+    def __dial(self, start: int, end: Optional[int] = None) -> IntArray:
+        """
+        Find the lowest cost paths from start using Dial's algorithm
+
+        Since every risk is between 1 and 9, all tiles waiting to be settled
+        have a cost within 9 of the current cost, so a circular array of 10
+        buckets indexed by cost can be used instead of a heap.
+
+        Args:
+            start (int): The flat index of the starting tile
+            end (Optional[int]): The flat index of the ending tile, or None to
+                find the lowest cost to every tile
+
+        Returns:
+            IntArray: The lowest cost to reach each tile, of which only the cost
+                of end is final if end was given
+        """
+        self.nodes_settled = 0
+        risks = self.__tile_risks()
+
+        # array for storing the lowest total risk found so far for each tile
+        cost = self.__new_cost_array()
+        cost[start] = 0
+
+        buckets = [[] for _ in range(10)]
+        buckets[0].append(start)
+        pending = 1
+        current_cost = 0
+        while pending:
+            bucket = buckets[current_cost % 10]
+            while bucket:
+                current = bucket.pop()
+                pending -= 1
+                # skip stale entries for tiles that were already reached more cheaply
+                if cost[current] < current_cost:
+                    continue
+                self.nodes_settled += 1
+                # the first time the end is popped its cost is final
+                if current == end:
+                    return cost
+                for neighbor in self.__neighbor_indices(current):
+                    cost_to_neighbor = current_cost + risks[neighbor]
+                    if cost[neighbor] > cost_to_neighbor:
+                        cost[neighbor] = cost_to_neighbor
+                        buckets[cost_to_neighbor % 10].append(neighbor)
+                        pending += 1
+            current_cost += 1
+
+        return cost
+
+    def __bidirectional(self, start: int, end: int) -> int:
+        """
+        Find the lowest cost path from start to end using bidirectional Dijkstra
+
+        One search runs forward from the start and another backward from the
+        end, always advancing the one with the cheaper next tile. Moving from
+        a tile to its neighbor costs the risk of the neighbor, so the backward
+        search pays the risk of the tile it moves away from instead. The cost
+        of the best path through an edge joining both searches is kept, and
+        the search stops once the two cheapest unsettled tiles together cost
+        at least that much, since no path found later could be cheaper.
+
+        Args:
+            start (int): The flat index of the starting tile
+            end (int): The flat index of the ending tile
+
+        Returns:
+            int: The lowest cost path from start to end
+        """
+        self.nodes_settled = 0
+        if start == end:
+            return 0
+        risks = self.__tile_risks()
+
+        # arrays for storing the lowest total risk found so far from the start
+        # to each tile and from each tile to the end
+        forward_cost = self.__new_cost_array()
+        backward_cost = self.__new_cost_array()
+        forward_cost[start] = 0
+        backward_cost[end] = 0
+
+        forward_heap = [(0, start)]
+        backward_heap = [(0, end)]
+        unreached = best = self.unreached
+        while forward_heap and backward_heap:
+            # no path through an unsettled tile can beat the best one found
+            if forward_heap[0][0] + backward_heap[0][0] >= best:
+                break
+            if forward_heap[0][0] <= backward_heap[0][0]:
+                current_cost, current = heapq.heappop(forward_heap)
+                if current_cost > forward_cost[current]:
+                    continue
+                self.nodes_settled += 1
+                for neighbor in self.__neighbor_indices(current):
+                    cost_to_neighbor = current_cost + risks[neighbor]
+                    if forward_cost[neighbor] > cost_to_neighbor:
+                        forward_cost[neighbor] = cost_to_neighbor
+                        heapq.heappush(forward_heap, (cost_to_neighbor, neighbor))
+                    if backward_cost[neighbor] != unreached:
+                        best = min(best, cost_to_neighbor + backward_cost[neighbor])
+            else:
+                current_cost, current = heapq.heappop(backward_heap)
+                if current_cost > backward_cost[current]:
+                    continue
+                self.nodes_settled += 1
+                cost_from_neighbor = current_cost + risks[current]
+                for neighbor in self.__neighbor_indices(current):
+                    if backward_cost[neighbor] > cost_from_neighbor:
+                        backward_cost[neighbor] = cost_from_neighbor
+                        heapq.heappush(backward_heap, (cost_from_neighbor, neighbor))
+                    if forward_cost[neighbor] != unreached:
+                        best = min(best, forward_cost[neighbor] + cost_from_neighbor)
+
+        return best
+
+    def __astar(self, start: int, end: int) -> tuple[int, list[int]]:
+        """
+        Find the lowest cost path from start to end using A* search
+
+        Every step costs at least 1, so the Manhattan distance to the end never
+        overestimates the remaining cost and the search can stop as soon as
+        the end is settled.
+
+        Args:
+            start (int): The flat index of the starting tile
+            end (int): The flat index of the ending tile
+
+        Returns:
+            tuple[int, list[int]]: The lowest cost from start to end and the flat
+                indices of the tiles on the path (empty if the end is unreachable)
+        """
+        self.nodes_settled = 0
+        risks = self.__tile_risks()
+        width = self.width
+        end_row, end_col = divmod(end, width)
+
+        # arrays for storing the lowest total risk found so far for each tile
+        # and the tile it was reached from
+        cost = self.__new_cost_array()
+        previous = self.__new_previous_array()
+        cost[start] = 0
+
+        # heap of (estimated total cost, cost, index)
+        start_row, start_col = divmod(start, width)
+        heap = [(abs(end_row - start_row) + abs(end_col - start_col), 0, start)]
+        while heap:
+            _, current_cost, current = heapq.heappop(heap)
+            # skip stale entries for tiles that were already reached more cheaply
+            if current_cost > cost[current]:
+                continue
+            self.nodes_settled += 1
+            # the first time the end is popped its cost is final
+            if current == end:
+                break
+            for neighbor in self.__neighbor_indices(current):
+                cost_to_neighbor = current_cost + risks[neighbor]
+                if cost[neighbor] > cost_to_neighbor:
+                    cost[neighbor] = cost_to_neighbor
+                    previous[neighbor] = current
+                    row, col = divmod(neighbor, width)
+                    estimate = (
+                        cost_to_neighbor + abs(end_row - row) + abs(end_col - col)
+                    )
+                    heapq.heappush(heap, (estimate, cost_to_neighbor, neighbor))
+        else:
+            # the end was not reachable from the start
+            return cost[end], []
+
+        # follow the previous tiles back from the end to rebuild the path
+        path = [end]
+        while path[-1] != start:
+            path.append(previous[path[-1]])
+        path.reverse()
+        return cost[end], path
 
     def __repr__(self):
         """Display a grid of numbers with no spaces"""
         return "\n".join(
             [
-                "".join([str(self._grid[row][col].risk) for col in range(self.width)])
+                "".join([str(self.__risk(row, col)) for col in range(self.width)])
                 for row in range(self.height)
             ]
         )
 
+    @classmethod
+    def from_grid(cls, grid: list[list[Tile]]) -> "RiskMap":
+        """
+        Create a risk map from a matrix of tiles
+
+        Args:
+            grid (list[list[Tile]]): A 2D matrix of tiles
+
+        Returns:
+            RiskMap: The risk map containing the risks of the tiles
+        """
+        risks = bytearray(tile.risk for row in grid for tile in row)
+        return cls(risks, len(grid[0]))
+
+    @classmethod
+    def from_mmap(cls, filename: str) -> "RiskMap":
+        """
+        Create a grid from a file without reading it into memory.
+
+        The file is memory-mapped and risk levels are read from the digits in
+        it when needed, using the position of the first line ending to find
+        where each row starts. Changes made with `update_risk` are not written
+        back to the file. The costs found by searches and the risks of the
+        expanded grid are stored in temporary files, so maps larger than the
+        available memory can be searched.
+
+        Args:
+            filename (str): The name of the file to map
+
+        Returns:
+            RiskMap: The risk map backed by the file
+        """
+        with open(filename, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        width = data.find(b"\n")
+        if width == -1:
+            width = stride = len(data)
+        else:
+            stride = width + 1
+            if width > 0 and data[width - 1] == ord("\r"):
+                width -= 1
+        return cls(MappedRisks(data, width, stride), width, file_backed=True)
+
     @classmethod
     def from_file(cls, filename: str) -> "RiskMap":
         """
         Create a grid from a file.
 
+        The digits are converted to risk levels directly from the bytes of
+        the file without creating a Tile for every character.
+
         Args:
             filename (str): The name of the file to read
 
         Returns:
             RiskMap: The risk map created from the file
         """
-        with open(filename) as f:
-            data = f.read().splitlines()
-        grid = [
-            [Tile(row, col, int(risk)) for col, risk in enumerate(row_data)]
-            for row, row_data in enumerate(data)
-        ]
-        return cls(grid)
+        with open(filename, "rb") as f:
+            data = f.read()
+        width = len(data.split(b"\n", 1)[0].rstrip(b"\r"))
+        # convert the digits to their values and drop the line endings
+        risks = bytearray(data.translate(DIGIT_VALUES, b"\r\n"))
+        return cls(risks, width)
 
 
 def main():
@@ -295,7 +1103,7 @@ def main():
     # the actual cave is 5 times expanded from the input
     risk_map.expand(5)
 
-    print(risk_map.min_cost(risk_map[0, 0], risk_map[-1, -1]))
+    print(risk_map.min_cost(risk_map[0, 0], risk_map[-1, -1], method="dijkstra"))
 
 
 if __name__ == "__main__":
@@ -92,6 +92,7 @@ Decode the structure of your hexadecimal-encoded BITS transmission; what do you
 import os
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from typing import Callable, Iterable, Iterator, Optional
 
 
 @dataclass
@@ -134,64 +135,165 @@ class OperatorPacket(Packet):
 
     def version_sum(self) -> int:
         """Calculate the version sum of the sub-packets plus the packet itself"""
-        return sum(packet.version_sum() for packet in self.packets) + self.version
+        # walk the packets with an explicit stack so any depth can be handled
+        total = 0
+        stack: list[Packet] = [self]
+        while stack:
+            packet = stack.pop()
+            total += packet.version
+            if isinstance(packet, OperatorPacket):
+                stack.extend(packet.packets)
+        return total
+
+
+def packet_events(read: Callable[[int], int]) -> Iterator[tuple]:
+    """
+    Decode the outermost packet of a transmission into events
+
+    The events are tuples whose first item is the kind of event:
+        ("literal", version, value)
+        ("operator_start", version, packet_type, length_type, length)
+        ("operator_end",)
+
+    Args:
+        read (Callable[[int], int]): Function reading the given number of next
+            bits of the transmission as an unsigned integer
+
+    Returns:
+        Iterator[tuple]: The events of the packet and its sub-packets, in the
+            order they appear in the transmission
+    """
+    position = 0
+    # [length_type, length, end, number of sub-packets so far] of each
+    # operator packet being decoded, where end is the position after its
+    # sub-packets if the length is in bits
+    stack = []
+    while True:
+        version = read(3)
+        packet_type = read(3)
+        position += 6
+
+        # Literal value packet
+        if packet_type == 4:
+            value = 0
+            while True:
+                group = read(5)
+                position += 5
+                value = value << 4 | group & 0b1111
+                if not group & 0b10000:
+                    break
+            yield ("literal", version, value)
+            finished = True
+
+        # Operator packet
+        else:
+            length_type = read(1)
+            if length_type == 0:
+                # next 15 bits are a number that represents the total length in bits of the sub-packets contained by this packet
+                length = read(15)
+                position += 16
+                end = position + length
+            else:
+                # next 11 bits are a number that represents the number of sub-packets immediately contained by this packet
+                length = read(11)
+                position += 12
+                end = None
+            yield ("operator_start", version, packet_type, length_type, length)
+            stack.append([length_type, length, end, 0])
+            finished = False
+
+        # count the packet in its parent and end any parents that are complete
+        while stack:
+            if finished:
+                stack[-1][3] += 1
+            length_type, length, end, subpackets = stack[-1]
+            if position < end if length_type == 0 else subpackets < length:
+                break
+            stack.pop()
+            yield ("operator_end",)
+            finished = True
+        else:
+            return
 
 
 class Bits:
     """
-    Class to represent a binary string of 1's and 0's and parse it into packets.
+    Class to represent a sequence of bits and parse it into packets.
+
+    The bits are kept as the original bytes and fields are read from them
+    with shifts and masks at a bit offset, so no copies of the remaining
+    bits are made while parsing.
     """
 
-    def __init__(self, bit_string: str):
+    def __init__(self, data: bytes, length: Optional[int] = None):
         """
         Constructor
 
         Args:
-            bit_string (int): A string of 1's and 0's to parse
+            data (bytes): The bytes containing the bits, most significant bit first
+            length (Optional[int]): The number of bits to use from the start of
+                the data, defaults to all of them
         """
-        self.data = bit_string
+        self.data = data
+        self.length = len(data) * 8 if length is None else length
 
-    def __parse_packet_recursive(self) -> tuple[Packet, "Bits"]:
+    def __read(self, offset: int, size: int) -> int:
         """
-        Parse the bits as a packet and recursively parse the sub-packets
+        Read an unsigned integer from the bits
+
+        Args:
+            offset (int): The position of the first bit to read
+            size (int): The number of bits to read
 
         Returns:
-            A tuple containing the parsed packet and the remaining bits.
+            int: The value of the bits
         """
-        data = self.data
-        version = int(data[0:3], 2)
-        packet_type = int(data[3:6], 2)
-        if packet_type == 4:
-            num = ""
-            for i in range(6, len(data), 5):
-                num += data[i + 1 : i + 5]
-                if data[i] == "0":
-                    break
-            value = int(num, 2)
-            return LiteralValuePacket(version, packet_type, value), Bits(data[i + 5 :])
-        length_type = data[6]
-        subpackets = []
-        if length_type == "0":
-            # next 15 bits are a number that represents the total length in bits of the sub-packets contained by this packet
-            length = int(data[7:22], 2)
-            subpacket_bits = Bits(data[22 : 22 + length])
-            while subpacket_bits.data:
-                subpacket, subpacket_bits = subpacket_bits.__parse_packet_recursive()
-                subpackets.append(subpacket)
-            data = data[22 + length :]
-        else:
-            # next 11 bits are a number that represents the number of sub-packets immediately contained by this packet
-            length = int(data[7:18], 2)
-            data = data[18:]
-            for i in range(0, length):
-                subpacket, bits = Bits(data).__parse_packet_recursive()
-                subpackets.append(subpacket)
-                data = bits.data
-
-        return (
-            OperatorPacket(version, packet_type, length_type, length, subpackets),
-            Bits(data),
-        )
+        if offset + size > self.length:
+            raise ValueError(f"Transmission ended while reading bits {offset}+{size}")
+        start, end = offset >> 3, (offset + size + 7) >> 3
+        chunk = int.from_bytes(self.data[start:end], "big")
+        return (chunk >> ((end << 3) - offset - size)) & ((1 << size) - 1)
+
+    def __events(self) -> Iterator[tuple]:
+        """
+        Decode the bits into packet events (see `packet_events`), reading each
+        field at a bit offset into the original bytes
+        """
+        offset = 0
+
+        def read(size: int) -> int:
+            nonlocal offset
+            value = self.__read(offset, size)
+            offset += size
+            return value
+
+        return packet_events(read)
+
+    def __parse_packet(self) -> Packet:
+        """
+        Parse the bits as a packet and its sub-packets
+
+        Operator packets that are still waiting for sub-packets are kept on an
+        explicit stack rather than in recursive calls, so packets can be
+        nested to any depth.
+
+        Returns:
+            The parsed packet.
+        """
+        # (version, packet_type, length_type, length, subpackets) of each
+        # operator packet being parsed
+        stack = []
+        for event in self.__events():
+            if event[0] == "operator_start":
+                stack.append((*event[1:], []))
+                continue
+            if event[0] == "literal":
+                packet = LiteralValuePacket(event[1], 4, event[2])
+            else:
+                packet = OperatorPacket(*stack.pop())
+            if not stack:
+                return packet
+            stack[-1][4].append(packet)
 
     def parse_as_packet(self) -> Packet:
         """
@@ -200,20 +302,136 @@ class Bits:
         Returns:
             The parsed packet.
         """
-        return self.__parse_packet_recursive()[0]
+        return self.__parse_packet()
 
     def __repr__(self):
-        return self.data
+        bits = bin(int.from_bytes(self.data, "big"))[2:].zfill(len(self.data) * 8)
+        return bits[: self.length]
 
     @classmethod
     def from_hex(cls, hex_string: str) -> "Bits":
         """
-        Convert a hex string to binary and left-pad with zeroes to make it a multiple of 4 bits
+        Convert a hex string to bits, keeping 4 bits for every hex digit
 
         Args:
             hex_string (str): A hex string to convert to binary
         """
-        return cls(bin(int(hex_string, 16))[2:].zfill(len(hex_string) * 4))
+        hex_string = hex_string.strip()
+        # pad to whole bytes; the extra bits are not part of the length
+        data = bytes.fromhex(hex_string + "0" * (len(hex_string) % 2))
+        return cls(data, len(hex_string) * 4)
+
+
+class BitsStream:
+    """
+    Class to decode a hexadecimal transmission that is read in chunks into a
+    stream of packet events, without keeping the packets or the whole
+    transmission in memory.
+
+    The events are tuples whose first item is the kind of event:
+        ("literal", version, value)
+        ("operator_start", version, packet_type, length_type, length)
+        ("operator_end",)
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        """
+        Constructor
+
+        Args:
+            chunks (Iterable[str]): Pieces of the hex string, in order
+        """
+        self._chunks = iter(chunks)
+        # bytes decoded from the chunks that have not been fully read yet
+        self._data = b""
+        self._data_length = 0
+        self._offset = 0
+        # a hex digit left over from a chunk of odd length
+        self._leftover = ""
+        self.position = 0
+
+    def __fill(self, size: int):
+        """
+        Decode chunks until at least the given number of bits is available
+
+        Args:
+            size (int): The number of bits that need to be available
+        """
+        while self._data_length - self._offset < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                if not self._leftover:
+                    raise ValueError(
+                        f"Transmission ended while reading bits {self.position}+{size}"
+                    )
+                # pad the last hex digit to a whole byte, but only its 4 bits are data
+                hex_string, size_in_bits = self._leftover + "0", 4
+                self._leftover = ""
+            else:
+                hex_string = self._leftover + "".join(chunk.split())
+                even_length = len(hex_string) - len(hex_string) % 2
+                self._leftover = hex_string[even_length:]
+                hex_string = hex_string[:even_length]
+                size_in_bits = even_length * 4
+            # drop the bytes that have been read
+            consumed = self._offset >> 3
+            self._data = self._data[consumed:] + bytes.fromhex(hex_string)
+            self._data_length += size_in_bits - consumed * 8
+            self._offset -= consumed * 8
+
+    def __read(self, size: int) -> int:
+        """
+        Read an unsigned integer from the next bits of the transmission
+
+        Args:
+            size (int): The number of bits to read
+
+        Returns:
+            int: The value of the bits
+        """
+        self.__fill(size)
+        offset = self._offset
+        start, end = offset >> 3, (offset + size + 7) >> 3
+        chunk = int.from_bytes(self._data[start:end], "big")
+        self._offset += size
+        self.position += size
+        return (chunk >> ((end << 3) - offset - size)) & ((1 << size) - 1)
+
+    def events(self) -> Iterator[tuple]:
+        """
+        Decode the outermost packet of the transmission into events
+
+        Returns:
+            Iterator[tuple]: The events of the packet and its sub-packets, in
+                the order they appear in the transmission
+        """
+        return packet_events(self.__read)
+
+    def version_sum(self) -> int:
+        """
+        Decode the transmission and add up the version numbers of all packets
+
+        Returns:
+            int: The sum of the version numbers
+        """
+        return sum(event[1] for event in self.events() if event[0] != "operator_end")
+
+    @classmethod
+    def from_file(cls, filename: str, chunk_size: int = 1 << 16) -> "BitsStream":
+        """
+        Create a stream that reads a hex string from a file in chunks
+
+        Args:
+            filename (str): The name of the file to read
+            chunk_size (int): The number of characters to read at a time
+        """
+
+        def read_chunks() -> Iterator[str]:
+            with open(filename) as f:
+                while chunk := f.read(chunk_size):
+                    yield chunk
+
+        return cls(read_chunks())
 
 
 def main():
@@ -28,8 +28,11 @@ What do you get if you evaluate the expression represented by your hexadecimal-e
 
 import os
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from array import array
+from dataclasses import dataclass, field
 from functools import reduce
+from multiprocessing import Pool
+from typing import Callable, Iterable, Iterator, Optional
 
 
 @dataclass
@@ -71,42 +74,385 @@ class OperatorPacket(Packet):
     """
 
     subpackets: list[Packet]
+    # the value once it has been calculated
+    __value: Optional[int] = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def value(self) -> int:
-        """For an operator packet, return the value of the operation"""
-        if self.packet_type == 0:
-            return sum(subpacket.value for subpacket in self.subpackets)
-        if self.packet_type == 1:
-            return reduce(lambda x, y: x * y, (p.value for p in self.subpackets))
-        if self.packet_type == 2:
-            return min(subpacket.value for subpacket in self.subpackets)
-        if self.packet_type == 3:
-            return max(subpacket.value for subpacket in self.subpackets)
-        if self.packet_type == 5:
-            return 1 if self.subpackets[0].value > self.subpackets[1].value else 0
-        if self.packet_type == 6:
-            return 1 if self.subpackets[0].value < self.subpackets[1].value else 0
-        if self.packet_type == 7:
-            return 1 if self.subpackets[0].value == self.subpackets[1].value else 0
-        raise ValueError(f"Unknown packet type: {self.packet_type}")
+        """
+        For an operator packet, return the value of the operation
+
+        The value of this packet and of every operator packet inside it is
+        cached, so it is only calculated once.
+        """
+        # evaluate the sub-packets with an explicit stack so any depth can be
+        # handled, each operator packet being visited again after its sub-packets
+        values: list[int] = []
+        stack: list[tuple[Packet, bool]] = [(self, False)]
+        while stack:
+            packet, visited = stack.pop()
+            if not isinstance(packet, OperatorPacket):
+                values.append(packet.value)
+            elif packet.__value is not None:
+                # the value was cached by an earlier evaluation
+                values.append(packet.__value)
+            elif not visited:
+                stack.append((packet, True))
+                stack.extend(
+                    (subpacket, False) for subpacket in reversed(packet.subpackets)
+                )
+            else:
+                # the values of the sub-packets are the last ones on the stack
+                start = len(values) - len(packet.subpackets)
+                operands = values[start:]
+                del values[start:]
+                values.append(OperatorPacket.operate(packet.packet_type, operands))
+                packet.__value = values[-1]
+        return values[0]
+
+    @staticmethod
+    def operate(packet_type: int, values: list[int]) -> int:
+        """
+        Apply the operation of an operator packet type to the values of its sub-packets
+
+        Args:
+            packet_type (int): The type ID of the operator packet
+            values (list[int]): The values of the sub-packets, in order
+
+        Returns:
+            int: The value of the operator packet
+        """
+        if packet_type == 0:
+            return sum(values)
+        if packet_type == 1:
+            return reduce(lambda x, y: x * y, values)
+        if packet_type == 2:
+            return min(values)
+        if packet_type == 3:
+            return max(values)
+        if packet_type == 5:
+            return 1 if values[0] > values[1] else 0
+        if packet_type == 6:
+            return 1 if values[0] < values[1] else 0
+        if packet_type == 7:
+            return 1 if values[0] == values[1] else 0
+        raise ValueError(f"Unknown packet type: {packet_type}")
+
+
+class PacketStore:
+    """
+    Class to store a tree of packets as parallel arrays instead of objects
+
+    Packets are numbered in the order they finish parsing, so the sub-packets
+    of a packet always come before it and the outermost packet is the last
+    one. The sub-packets of packet i are the packets numbered in
+    children[first_child[i] : first_child[i] + child_count[i]].
+    """
+
+    # values that do not fit in 64 bits are kept separately, marked by this value
+    BIG_VALUE = 2**64 - 1
+
+    def __init__(self):
+        self.versions = array("B")
+        self.packet_types = array("B")
+        self.first_child = array("I")
+        self.child_count = array("I")
+        self.children = array("I")
+        self._values = array("Q")
+        self._big_values: dict[int, int] = {}
+        self._evaluated = 0
+
+    def __len__(self) -> int:
+        return len(self.versions)
+
+    @property
+    def root(self) -> int:
+        """The number of the outermost packet"""
+        return len(self) - 1
+
+    def __set_value(self, index: int, value: int):
+        """Store the value of a packet, or a placeholder if it is too big"""
+        if value >= self.BIG_VALUE:
+            self._big_values[index] = value
+            value = self.BIG_VALUE
+        if index == len(self._values):
+            self._values.append(value)
+        else:
+            self._values[index] = value
+
+    def __get_value(self, index: int) -> int:
+        """Return the stored value of a packet"""
+        value = self._values[index]
+        return self._big_values[index] if value == self.BIG_VALUE else value
+
+    def add_literal(self, version: int, value: int) -> int:
+        """
+        Add a literal value packet
+
+        Args:
+            version (int): The version of the packet
+            value (int): The value of the packet
+
+        Returns:
+            int: The number of the packet
+        """
+        self.versions.append(version)
+        self.packet_types.append(4)
+        self.first_child.append(len(self.children))
+        self.child_count.append(0)
+        self.__set_value(len(self._values), value)
+        return len(self) - 1
+
+    def add_operator(self, version: int, packet_type: int, children: list[int]) -> int:
+        """
+        Add an operator packet whose sub-packets have already been added
+
+        Args:
+            version (int): The version of the packet
+            packet_type (int): The type ID of the packet
+            children (list[int]): The numbers of the sub-packets, in order
+
+        Returns:
+            int: The number of the packet
+        """
+        self.versions.append(version)
+        self.packet_types.append(packet_type)
+        self.first_child.append(len(self.children))
+        self.child_count.append(len(children))
+        self.children.extend(children)
+        # the value is calculated by evaluate
+        self._values.append(0)
+        return len(self) - 1
+
+    def subpackets(self, index: int) -> array:
+        """Return the numbers of the sub-packets of a packet"""
+        start = self.first_child[index]
+        return self.children[start : start + self.child_count[index]]
+
+    def evaluate(self):
+        """
+        Calculate the values of all operator packets that were added since the
+        last evaluation, in one pass from the first packet to the last
+        """
+        for index in range(self._evaluated, len(self)):
+            packet_type = self.packet_types[index]
+            if packet_type != 4:
+                operands = [self.__get_value(child) for child in self.subpackets(index)]
+                self.__set_value(index, OperatorPacket.operate(packet_type, operands))
+        self._evaluated = len(self)
+
+    def value(self, index: Optional[int] = None) -> int:
+        """
+        Return the value of a packet, evaluating the store first if needed
+
+        Args:
+            index (Optional[int]): The number of the packet, defaults to the
+                outermost packet
+
+        Returns:
+            int: The value of the packet
+        """
+        if index is None:
+            index = self.root
+        if index >= self._evaluated and self.packet_types[index] != 4:
+            self.evaluate()
+        return self.__get_value(index)
+
+    def version_sum(self) -> int:
+        """Return the sum of the version numbers of all packets"""
+        return sum(self.versions)
+
+    @classmethod
+    def from_events(cls, events: Iterable[tuple]) -> "PacketStore":
+        """
+        Create a packet store from the events of a `BitsStream`
+
+        Args:
+            events (Iterable[tuple]): The events of the outermost packet
+
+        Returns:
+            PacketStore: The store containing every packet
+        """
+        store = cls()
+        # (version, packet_type, numbers of the sub-packets) of each operator
+        # packet being added
+        stack = []
+        for event in events:
+            if event[0] == "operator_start":
+                stack.append((event[1], event[2], []))
+                continue
+            if event[0] == "literal":
+                index = store.add_literal(event[1], event[2])
+            else:
+                index = store.add_operator(*stack.pop())
+            if stack:
+                stack[-1][2].append(index)
+        return store
+
+
+def packet_events(read: Callable[[int], int]) -> Iterator[tuple]:
+    """
+    Decode the outermost packet of a transmission into events
+
+    The events are tuples whose first item is the kind of event:
+        ("literal", version, value)
+        ("operator_start", version, packet_type, length_type, length)
+        ("operator_end",)
+
+    Args:
+        read (Callable[[int], int]): Function reading the given number of next
+            bits of the transmission as an unsigned integer
+
+    Returns:
+        Iterator[tuple]: The events of the packet and its sub-packets, in the
+            order they appear in the transmission
+    """
+    position = 0
+    # [length_type, length, end, number of sub-packets so far] of each
+    # operator packet being decoded, where end is the position after its
+    # sub-packets if the length is in bits
+    stack = []
+    while True:
+        version = read(3)
+        packet_type = read(3)
+        position += 6
+
+        # Literal value packet
+        if packet_type == 4:
+            value = 0
+            while True:
+                group = read(5)
+                position += 5
+                value = value << 4 | group & 0b1111
+                if not group & 0b10000:
+                    break
+            yield ("literal", version, value)
+            finished = True
+
+        # Operator packet
+        else:
+            length_type = read(1)
+            if length_type == 0:
+                # next 15 bits are a number that represents the total length in bits of the sub-packets contained by this packet
+                length = read(15)
+                position += 16
+                end = position + length
+            else:
+                # next 11 bits are a number that represents the number of sub-packets immediately contained by this packet
+                length = read(11)
+                position += 12
+                end = None
+            yield ("operator_start", version, packet_type, length_type, length)
+            stack.append([length_type, length, end, 0])
+            finished = False
+
+        # count the packet in its parent and end any parents that are complete
+        while stack:
+            if finished:
+                stack[-1][3] += 1
+            length_type, length, end, subpackets = stack[-1]
+            if position < end if length_type == 0 else subpackets < length:
+                break
+            stack.pop()
+            yield ("operator_end",)
+            finished = True
+        else:
+            return
+
+
+def evaluate_events(events: Iterable[tuple]) -> tuple[int, int]:
+    """
+    Calculate the version sum and the value of a packet from its events
+
+    The values of sub-packets are combined as soon as they are decoded
+    where the operation allows it, so only the operator packets being
+    decoded and at most two values for each of them are kept.
+
+    Args:
+        events (Iterable[tuple]): The events of the packet (see `packet_events`)
+
+    Returns:
+        tuple[int, int]: The sum of the version numbers of all packets and the
+            value of the packet
+    """
+    version_sum = 0
+    # (packet_type, values of the sub-packets) of each operator packet being decoded
+    stack = []
+    for event in events:
+        if event[0] == "operator_start":
+            version_sum += event[1]
+            stack.append((event[2], []))
+            continue
+        if event[0] == "literal":
+            version_sum += event[1]
+            value = event[2]
+        else:
+            packet_type, values = stack.pop()
+            value = OperatorPacket.operate(packet_type, values)
+        if not stack:
+            return version_sum, value
+        packet_type, values = stack[-1]
+        # sum, product, minimum and maximum can be combined one value at a time
+        if packet_type <= 3 and values:
+            values[0] = OperatorPacket.operate(packet_type, [values[0], value])
+        else:
+            values.append(value)
 
 
 class Bits:
     """
-    Class to represent a binary string of 1's and 0's and parse it into packets.
+    Class to represent a sequence of bits and parse it into packets.
+
+    The bits are kept as the original bytes and fields are read from them
+    with shifts and masks at a bit offset, so no copies of the remaining
+    bits are made while parsing.
     """
 
-    def __init__(self, bit_string: str):
+    def __init__(self, data: bytes, length: Optional[int] = None):
         """
         Constructor
 
         Args:
-            bit_string (int): A string of 1's and 0's to parse
+            data (bytes): The bytes containing the bits, most significant bit first
+            length (Optional[int]): The number of bits to use from the start of
+                the data, defaults to all of them
+        """
+        self.data = data
+        self.length = len(data) * 8 if length is None else length
+
+    def __read(self, offset: int, size: int) -> int:
+        """
+        Read an unsigned integer from the bits
+
+        Args:
+            offset (int): The position of the first bit to read
+            size (int): The number of bits to read
+
+        Returns:
+            int: The value of the bits
         """
-        self.data = bit_string
+        if offset + size > self.length:
+            raise ValueError(f"Transmission ended while reading bits {offset}+{size}")
+        start, end = offset >> 3, (offset + size + 7) >> 3
+        chunk = int.from_bytes(self.data[start:end], "big")
+        return (chunk >> ((end << 3) - offset - size)) & ((1 << size) - 1)
+
+    def __events(self) -> Iterator[tuple]:
+        """
+        Decode the bits into packet events (see `packet_events`), reading each
+        field at a bit offset into the original bytes
+        """
+        offset = 0
+
+        def read(size: int) -> int:
+            nonlocal offset
+            value = self.__read(offset, size)
+            offset += size
+            return value
+
+        return packet_events(read)
 
-    def __parse_packet_recursive(self) -> tuple[Packet, "Bits"]:
+    def __parse_packet(self) -> Packet:
         """
         Parse the bits as a packet.
 
@@ -119,60 +465,222 @@ class Bits:
         Packets with type ID 6 are less than packets - their value is 1 if the value of the first sub-packet is less than the value of the second sub-packet; otherwise, their value is 0. These packets always have exactly two sub-packets.
         Packets with type ID 7 are equal to packets - their value is 1 if the value of the first sub-packet is equal to the value of the second sub-packet; otherwise, their value is 0. These packets always have exactly two sub-packets.
 
+        Operator packets that are still waiting for sub-packets are kept on an
+        explicit stack rather than in recursive calls, so packets can be
+        nested to any depth.
+
         Returns:
-            A tuple containing the parsed packet and the remaining bits.
+            The parsed packet.
         """
-        data = self.data
-        version = int(data[0:3], 2)
-        packet_type = int(data[3:6], 2)
+        # (version, packet_type, subpackets) of each operator packet being parsed
+        stack = []
+        for event in self.__events():
+            if event[0] == "operator_start":
+                stack.append((event[1], event[2], []))
+                continue
+            if event[0] == "literal":
+                packet = LiteralValuePacket(event[1], 4, event[2])
+            else:
+                packet = OperatorPacket(*stack.pop())
+            if not stack:
+                return packet
+            stack[-1][2].append(packet)
 
-        # Literal value packet
-        if packet_type == 4:
-            num = ""
-            for i in range(6, len(data), 5):
-                num += data[i + 1 : i + 5]
-                if data[i] == "0":
-                    break
-            value = int(num, 2)
-            return LiteralValuePacket(version, packet_type, value), Bits(data[i + 5 :])
+    def parse_as_packet(self) -> Packet:
+        return self.__parse_packet()
 
-        # Operator packet
-        length_type = data[6]
-        subpackets = []
-        if length_type == "0":
-            # next 15 bits are a number that represents the total length in bits of the sub-packets contained by this packet
-            length = int(data[7:22], 2)
-            subpacket_bits = Bits(data[22 : 22 + length])
-            while subpacket_bits.data:
-                subpacket, subpacket_bits = subpacket_bits.__parse_packet_recursive()
-                subpackets.append(subpacket)
-            data = data[22 + length :]
-        else:
-            # next 11 bits are a number that represents the number of sub-packets immediately contained by this packet
-            length = int(data[7:18], 2)
-            data = data[18:]
-            for i in range(0, length):
-                subpacket, bits = Bits(data).__parse_packet_recursive()
-                subpackets.append(subpacket)
-                data = bits.data
+    def parse_as_store(self) -> PacketStore:
+        """
+        Parse the bits into a packet store instead of packet objects.
 
-        return OperatorPacket(version, packet_type, subpackets), Bits(data)
+        Returns:
+            The store containing the packets.
+        """
+        return PacketStore.from_events(self.__events())
 
-    def parse_as_packet(self) -> Packet:
-        return self.__parse_packet_recursive()[0]
+    def evaluate(self) -> tuple[int, int]:
+        """
+        Calculate the version sum and the value of the packet while parsing it,
+        without creating any packet objects (see `evaluate_events`).
+
+        Returns:
+            tuple[int, int]: The sum of the version numbers of all packets and
+                the value of the outermost packet
+        """
+        return evaluate_events(self.__events())
 
     def __repr__(self):
-        return self.data
+        bits = bin(int.from_bytes(self.data, "big"))[2:].zfill(len(self.data) * 8)
+        return bits[: self.length]
 
     @classmethod
     def from_hex(cls, hex_string: str) -> "Bits":
         """
-        Convert a hex string to binary and left-pad with zeroes to make it a multiple of 4 bits
+        Convert a hex string to bits, keeping 4 bits for every hex digit
 
         Args:
             hex_string (str): A hex string to convert to binary
         """
-        return cls(bin(int(hex_string, 16))[2:].zfill(len(hex_string) * 4))
+        hex_string = hex_string.strip()
+        # pad to whole bytes; the extra bits are not part of the length
+        data = bytes.fromhex(hex_string + "0" * (len(hex_string) % 2))
+        return cls(data, len(hex_string) * 4)
+
+
+class BitsStream:
+    """
+    Class to decode a hexadecimal transmission that is read in chunks into a
+    stream of packet events, without keeping the packets or the whole
+    transmission in memory.
+
+    The events are tuples whose first item is the kind of event:
+        ("literal", version, value)
+        ("operator_start", version, packet_type, length_type, length)
+        ("operator_end",)
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        """
+        Constructor
+
+        Args:
+            chunks (Iterable[str]): Pieces of the hex string, in order
+        """
+        self._chunks = iter(chunks)
+        # bytes decoded from the chunks that have not been fully read yet
+        self._data = b""
+        self._data_length = 0
+        self._offset = 0
+        # a hex digit left over from a chunk of odd length
+        self._leftover = ""
+        self.position = 0
+
+    def __fill(self, size: int):
+        """
+        Decode chunks until at least the given number of bits is available
+
+        Args:
+            size (int): The number of bits that need to be available
+        """
+        while self._data_length - self._offset < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                if not self._leftover:
+                    raise ValueError(
+                        f"Transmission ended while reading bits {self.position}+{size}"
+                    )
+                # pad the last hex digit to a whole byte, but only its 4 bits are data
+                hex_string, size_in_bits = self._leftover + "0", 4
+                self._leftover = ""
+            else:
+                hex_string = self._leftover + "".join(chunk.split())
+                even_length = len(hex_string) - len(hex_string) % 2
+                self._leftover = hex_string[even_length:]
+                hex_string = hex_string[:even_length]
+                size_in_bits = even_length * 4
+            # drop the bytes that have been read
+            consumed = self._offset >> 3
+            self._data = self._data[consumed:] + bytes.fromhex(hex_string)
+            self._data_length += size_in_bits - consumed * 8
+            self._offset -= consumed * 8
+
+    def __read(self, size: int) -> int:
+        """
+        Read an unsigned integer from the next bits of the transmission
+
+        Args:
+            size (int): The number of bits to read
+
+        Returns:
+            int: The value of the bits
+        """
+        self.__fill(size)
+        offset = self._offset
+        start, end = offset >> 3, (offset + size + 7) >> 3
+        chunk = int.from_bytes(self._data[start:end], "big")
+        self._offset += size
+        self.position += size
+        return (chunk >> ((end << 3) - offset - size)) & ((1 << size) - 1)
+
+    def events(self) -> Iterator[tuple]:
+        """
+        Decode the outermost packet of the transmission into events
+
+        Returns:
+            Iterator[tuple]: The events of the packet and its sub-packets, in
+                the order they appear in the transmission
+        """
+        return packet_events(self.__read)
+
+    def value(self) -> int:
+        """
+        Decode the transmission and calculate the value of its outermost
+        packet (see `evaluate_events`)
+
+        Returns:
+            int: The value of the outermost packet
+        """
+        return evaluate_events(self.events())[1]
+
+    @classmethod
+    def from_file(cls, filename: str, chunk_size: int = 1 << 16) -> "BitsStream":
+        """
+        Create a stream that reads a hex string from a file in chunks
+
+        Args:
+            filename (str): The name of the file to read
+            chunk_size (int): The number of characters to read at a time
+        """
+
+        def read_chunks() -> Iterator[str]:
+            with open(filename) as f:
+                while chunk := f.read(chunk_size):
+                    yield chunk
+
+        return cls(read_chunks())
+
+
+def evaluate_hex(hex_string: str) -> tuple[int, int]:
+    """
+    Calculate the version sum and the value of a hex transmission
+
+    Args:
+        hex_string (str): The hex string of the transmission
+
+    Returns:
+        tuple[int, int]: The version sum and the value of the outermost packet
+    """
+    return Bits.from_hex(hex_string).evaluate()
+
+
+def evaluate_file(
+    filename: str, workers: Optional[int] = None, chunk_size: int = 256
+) -> Iterator[tuple[int, int]]:
+    """
+    Calculate the version sum and the value of every transmission in a file,
+    spreading the work over a pool of processes
+
+    The file is read one line at a time and the lines are sent to the workers
+    in chunks, so the whole file is never held in memory. Blank lines are
+    skipped.
+
+    Args:
+        filename (str): The name of a file with one hex transmission per line
+        workers (Optional[int]): The number of processes to use, defaults to
+            the number of CPUs; with 1 the lines are decoded in this process
+        chunk_size (int): The number of lines to send to a worker at a time
+
+    Returns:
+        Iterator[tuple[int, int]]: The version sum and value of each
+            transmission, in the order of the lines in the file
+    """
+    with open(filename) as f:
+        lines = (line for line in f if not line.isspace())
+        if workers == 1:
+            yield from map(evaluate_hex, lines)
+            return
+        with Pool(workers) as pool:
+            yield from pool.imap(evaluate_hex, lines, chunk_size)
 
 
 def main():
@@ -181,7 +689,9 @@ def main():
 
     bits = Bits.from_hex(data)
 
-    print(f"The value of the packet is {bits.parse_as_packet().value}")
+    _, value = bits.evaluate()
+
+    print(f"The value of the packet is {value}")
 
 
 if __name__ == "__main__":
@@ -105,6 +105,7 @@ Find the initial velocity that causes the probe to reach the highest y position
 
 import os
 import re
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 from typing import Optional
 
@@ -202,6 +203,37 @@ class ProbeLauncher:
             x_velocity += self.__x_velocity_change(x_velocity)
             y_velocity += self.__y_velocity_change(y_velocity)
 
+    def __hits(self, initial_pos: Point, xv_i: int, yv_i: int) -> bool:
+        """
+        Check if the probe launched with the given initial velocity hits the target
+        area, assuming the target area is to the right of and below the initial position
+
+        Args:
+            initial_pos (Point): The initial position of the probe
+            xv_i (int): The initial x velocity, at least 0
+            yv_i (int): The initial y velocity
+
+        Returns:
+            bool: True if the probe is within the target area after any step
+        """
+        # a probe launched upward is back at its starting height after 2 * yv_i + 1
+        # steps without having been in the target area, so skip straight there
+        steps = 2 * yv_i + 1 if yv_i > 0 else 0
+        x_steps = min(steps, xv_i)
+        position = Point(
+            initial_pos.x + x_steps * xv_i - x_steps * (x_steps - 1) // 2,
+            initial_pos.y,
+        )
+        x_velocity, y_velocity = xv_i - x_steps, yv_i - steps
+        while True:
+            position += Point(x_velocity, y_velocity)
+            if self.target_area.contains(position):
+                return True
+            if self.target_area.missed_by(initial_pos, position):
+                return False
+            x_velocity += self.__x_velocity_change(x_velocity)
+            y_velocity += self.__y_velocity_change(y_velocity)
+
     def best_trajectory(self, initial_pos: Point = Point(0, 0)) -> tuple[Point, int]:
         """
         Find the initial velocity that causes the probe to reach the highest y position
@@ -213,12 +245,33 @@ class ProbeLauncher:
         Returns:
             tuple[Point, int]: The initial velocity and the maximum y position reached by the probe.
         """
-        max_y = float("-inf")
-        best_initial_velocity = None
         # set range for brute force based on assumptions from data
         start_x_velocity, end_x_velocity = initial_pos.x, self.target_area.x_max
         end_y_velocity = max(abs(self.target_area.y_min), abs(self.target_area.y_max))
         start_y_velocity = -end_y_velocity
+        if (
+            self.target_area.x_min > initial_pos.x
+            and self.target_area.y_max < initial_pos.y
+        ):
+            x_min = self.target_area.x_min - initial_pos.x
+            x_max = self.target_area.x_max - initial_pos.x
+            depth_max = initial_pos.y - self.target_area.y_min
+            # the probe stops once it has moved the triangular number of its velocity
+            min_x_velocity = 1
+            while min_x_velocity * (min_x_velocity + 1) // 2 < x_min:
+                min_x_velocity += 1
+            x_velocities = range(
+                max(start_x_velocity, min_x_velocity), min(end_x_velocity, x_max) + 1
+            )
+            # a probe launched upward comes back to its starting height moving down
+            # at yv_i + 1, so it overshoots the target area if that is depth_max
+            for yv_i in range(min(end_y_velocity, depth_max - 1), 0, -1):
+                for xv_i in x_velocities:
+                    if self.__hits(initial_pos, xv_i, yv_i):
+                        # the probe peaks after yv_i steps, at the triangular number
+                        return Point(xv_i, yv_i), initial_pos.y + yv_i * (yv_i + 1) // 2
+        max_y = float("-inf")
+        best_initial_velocity = None
         # brute force finding the best initial velocity
         for xv_i in range(start_x_velocity, end_x_velocity + 1):
             for yv_i in range(start_y_velocity, end_y_velocity + 1):
@@ -228,6 +281,157 @@ class ProbeLauncher:
                     best_initial_velocity = Point(xv_i, yv_i)
         return best_initial_velocity, max_y
 
+    def sweep_trajectories(
+        self, initial_pos: Point = Point(0, 0)
+    ) -> tuple[Point, int, int]:
+        """
+        Find both the best trajectory and the number of trajectories that hit the
+        target area from one pass over the steps at which each x and y velocity
+        is within the target area
+
+        Args:
+            initial_pos (Point): The initial position of the probe
+
+        Returns:
+            tuple[Point, int, int]: The initial velocity and the maximum y position
+                reached by the probe, as from `best_trajectory`, and the number of
+                trajectories that will hit the target area
+        """
+        # set range for brute force based on assumptions from data
+        start_x_velocity, end_x_velocity = initial_pos.x, self.target_area.x_max
+        end_y_velocity = max(abs(self.target_area.y_min), abs(self.target_area.y_max))
+        start_y_velocity = -end_y_velocity
+        if (
+            self.target_area.x_min > initial_pos.x
+            and self.target_area.y_max < initial_pos.y
+        ):
+            x_ranges = {
+                xv_i: steps
+                for xv_i, steps in self.__x_step_ranges(initial_pos).items()
+                if start_x_velocity <= xv_i <= end_x_velocity
+            }
+            y_ranges = {
+                yv_i: steps
+                for yv_i, steps in self.__y_step_ranges(initial_pos).items()
+                if start_y_velocity <= yv_i <= end_y_velocity
+            }
+            x_first_steps = sorted(x_first for x_first, _ in x_ranges.values())
+            x_last_steps = sorted(x_last for _, x_last in x_ranges.values())
+            # the x ranges that overlap a y range are those starting before it ends,
+            # except those that also end before it starts
+            count = sum(
+                bisect_right(x_first_steps, y_last) - bisect_left(x_last_steps, y_first)
+                for y_first, y_last in y_ranges.values()
+            )
+            # the highest hitting y velocity peaks highest, at its triangular number
+            for yv_i in sorted(y_ranges, reverse=True):
+                if yv_i <= 0:
+                    break
+                y_first, y_last = y_ranges[yv_i]
+                for xv_i, (x_first, x_last) in x_ranges.items():
+                    if x_first <= y_last and y_first <= x_last:
+                        max_y = initial_pos.y + yv_i * (yv_i + 1) // 2
+                        return Point(xv_i, yv_i), max_y, count
+            # every other hit peaks at the initial position, so the brute force
+            # keeps the first one, with the lowest x and then y velocity, unless
+            # a maximum y position of 0 is not counted
+            if initial_pos.y:
+                down_y_velocities = sorted(yv_i for yv_i in y_ranges if yv_i <= 0)
+                for xv_i, (x_first, x_last) in x_ranges.items():
+                    for yv_i in down_y_velocities:
+                        y_first, y_last = y_ranges[yv_i]
+                        if x_first <= y_last and y_first <= x_last:
+                            return Point(xv_i, yv_i), initial_pos.y, count
+            return None, float("-inf"), count
+
+        max_y = float("-inf")
+        best_initial_velocity = None
+        count = 0
+        # brute force finding the best initial velocity and the number of hits
+        for xv_i in range(start_x_velocity, end_x_velocity + 1):
+            for yv_i in range(start_y_velocity, end_y_velocity + 1):
+                y_pos = self.launch(initial_pos, xv_i, yv_i)
+                if y_pos is None:
+                    continue
+                count += 1
+                if y_pos and y_pos > max_y:
+                    max_y = y_pos
+                    best_initial_velocity = Point(xv_i, yv_i)
+        return best_initial_velocity, max_y, count
+
+    def __x_step_ranges(self, initial_pos: Point) -> dict[int, tuple[int, float]]:
+        """
+        Find the steps at which the x position is within the target area for
+        each initial x velocity, assuming the target area is to the right
+
+        Args:
+            initial_pos (Point): The initial position of the probe
+
+        Returns:
+            dict[int, tuple[int, float]]: The first and last step within the target
+                area by x velocity, in increasing order of velocity, the last being
+                infinity if the probe stops inside it; velocities that miss the
+                target area are left out
+        """
+        x_min = self.target_area.x_min - initial_pos.x
+        x_max = self.target_area.x_max - initial_pos.x
+        ranges = {}
+        for xv_i in range(1, x_max + 1):
+            # the probe stops once it has moved the triangular number of its velocity
+            if xv_i * (xv_i + 1) // 2 < x_min:
+                continue
+            x, x_velocity, step = 0, xv_i, 0
+            while x < x_min:
+                x += x_velocity
+                x_velocity -= 1
+                step += 1
+            if x > x_max:
+                continue
+            first_step = step
+            while x_velocity > 0 and x + x_velocity <= x_max:
+                x += x_velocity
+                x_velocity -= 1
+                step += 1
+            ranges[xv_i] = (first_step, step if x_velocity > 0 else float("inf"))
+        return ranges
+
+    def __y_step_ranges(self, initial_pos: Point) -> dict[int, tuple[int, int]]:
+        """
+        Find the steps at which the y position is within the target area for
+        each initial y velocity, assuming the target area is below
+
+        Args:
+            initial_pos (Point): The initial position of the probe
+
+        Returns:
+            dict[int, tuple[int, int]]: The first and last step within the target
+                area by y velocity; velocities that miss the target area are left out
+        """
+        y_min = self.target_area.y_min - initial_pos.y
+        y_max = self.target_area.y_max - initial_pos.y
+        ranges = {}
+        for yv_i in range(y_min, 0):
+            y, y_velocity, step = 0, yv_i, 0
+            while y > y_max:
+                y += y_velocity
+                y_velocity -= 1
+                step += 1
+            if y < y_min:
+                continue
+            first_step = step
+            while y + y_velocity >= y_min:
+                y += y_velocity
+                y_velocity -= 1
+                step += 1
+            ranges[yv_i] = (first_step, step)
+        # a probe launched upward is back at its starting height after 2 * yv_i + 1
+        # steps, moving down at yv_i + 1, so it hits like that downward velocity
+        for yv_i in range(0, -y_min):
+            if -(yv_i + 1) in ranges:
+                first_step, last_step = ranges[-(yv_i + 1)]
+                ranges[yv_i] = (first_step + 2 * yv_i + 1, last_step + 2 * yv_i + 1)
+        return ranges
+
 
 def main():
     with open(os.path.join(os.path.dirname(__file__), "input.txt")) as f:
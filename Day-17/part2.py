@@ -25,8 +25,12 @@ How many distinct initial velocity values cause the probe to be within the targe
 
 import os
 import re
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
 
 
 @dataclass
@@ -81,6 +85,18 @@ class TargetArea:
         )
 
 
+@dataclass
+class HitMap:
+    """Class to hold the outcome of launching a probe at every velocity in a grid"""
+
+    x_velocities: "np.ndarray"
+    y_velocities: "np.ndarray"
+    # hits[i, j] is True if x_velocities[i], y_velocities[j] hits the target area
+    hits: "np.ndarray"
+    # highest y position reached before the probe hit or missed the target area
+    max_heights: "np.ndarray"
+
+
 class ProbeLauncher:
     """Class for simulating the launching of probes toward a target area"""
 
@@ -121,16 +137,31 @@ class ProbeLauncher:
             x_velocity += self.__x_velocity_change(x_velocity)
             y_velocity += self.__y_velocity_change(y_velocity)
 
-    def count_trajectories(self, initial_pos: Point = Point(0, 0)) -> int:
+    def count_trajectories(
+        self, initial_pos: Point = Point(0, 0), method: str = "simulate"
+    ) -> int:
         """
         Count the number of trajectories that will hit the target area
 
         Args:
             initial_pos (Point): The initial position of the probe
+            method (str): "simulate" to launch a probe for every velocity, or
+                "analytic" to combine the steps at which each x and y velocity
+                is within the target area; "analytic" needs the target area to
+                be to the right of and below the initial position and falls
+                back to "simulate" otherwise
 
         Returns:
             int: The number of trajectories that will hit the target area
         """
+        if method == "analytic":
+            if (
+                self.target_area.x_min > initial_pos.x
+                and self.target_area.y_max < initial_pos.y
+            ):
+                return self.__count_trajectories_analytic(initial_pos)
+        elif method != "simulate":
+            raise ValueError(f"Unknown method: {method}")
         # set range for brute force based on assumptions from data
         start_x_velocity, end_x_velocity = initial_pos.x, self.target_area.x_max
         end_y_velocity = max(abs(self.target_area.y_min), abs(self.target_area.y_max))
@@ -142,6 +173,324 @@ class ProbeLauncher:
             for yv_i in range(start_y_velocity, end_y_velocity + 1)
         )
 
+    def hit_map(self, initial_pos: Point = Point(0, 0)) -> HitMap:
+        """
+        Launch a probe at every velocity in the brute force range at once using NumPy
+
+        All probes are advanced together as arrays by the same rules as `launch`,
+        and probes are dropped as soon as they hit or miss the target area.
+
+        Args:
+            initial_pos (Point): The initial position of the probe
+
+        Returns:
+            HitMap: Whether each velocity hits the target area and the highest
+                y position reached with it
+        """
+        # pip install -U numpy
+        import numpy as np
+
+        target = self.target_area
+        # set range based on the same assumptions from data as the brute force
+        end_y_velocity = max(abs(target.y_min), abs(target.y_max))
+        x_velocities = np.arange(initial_pos.x, target.x_max + 1, dtype=np.int64)
+        y_velocities = np.arange(-end_y_velocity, end_y_velocity + 1, dtype=np.int64)
+        shape = (len(x_velocities), len(y_velocities))
+        hits = np.zeros(shape, dtype=bool).ravel()
+        max_heights = np.full(shape, initial_pos.y, dtype=np.int64).ravel()
+
+        # state of the probes that are still flying, by their index in the grid
+        index = np.arange(hits.size)
+        x_velocity = np.repeat(x_velocities, len(y_velocities))
+        y_velocity = np.tile(y_velocities, len(x_velocities))
+        x = np.full(hits.size, initial_pos.x, dtype=np.int64)
+        y = np.full(hits.size, initial_pos.y, dtype=np.int64)
+        while index.size:
+            x += x_velocity
+            y += y_velocity
+            max_heights[index] = np.maximum(max_heights[index], y)
+            inside = (
+                (target.x_min <= x)
+                & (x <= target.x_max)
+                & (target.y_min <= y)
+                & (y <= target.y_max)
+            )
+            hits[index[inside]] = True
+            missed = y < target.y_min
+            if target.x_min >= initial_pos.x:
+                missed |= x > target.x_max
+            if target.x_max <= initial_pos.x:
+                missed |= x < target.x_min
+            flying = ~(inside | missed)
+            index, x, y = index[flying], x[flying], y[flying]
+            # drag moves the x velocity toward 0 and gravity lowers the y velocity
+            x_velocity = x_velocity[flying] - np.sign(x_velocity[flying])
+            y_velocity = y_velocity[flying] - 1
+
+        return HitMap(
+            x_velocities, y_velocities, hits.reshape(shape), max_heights.reshape(shape)
+        )
+
+    def __x_step_ranges(self, initial_pos: Point) -> dict[int, tuple[int, float]]:
+        """
+        Find the steps at which the x position is within the target area for
+        each initial x velocity, assuming the target area is to the right
+
+        Args:
+            initial_pos (Point): The initial position of the probe
+
+        Returns:
+            dict[int, tuple[int, float]]: The first and last step within the target
+                area by x velocity, the last being infinity if the probe stops
+                inside it; velocities that miss the target area are left out
+        """
+        x_min = self.target_area.x_min - initial_pos.x
+        x_max = self.target_area.x_max - initial_pos.x
+        ranges = {}
+        for xv_i in range(1, x_max + 1):
+            # the probe stops once it has moved the triangular number of its velocity
+            if xv_i * (xv_i + 1) // 2 < x_min:
+                continue
+            x, x_velocity, step = 0, xv_i, 0
+            while x < x_min:
+                x += x_velocity
+                x_velocity -= 1
+                step += 1
+            if x > x_max:
+                continue
+            first_step = step
+            while x_velocity > 0 and x + x_velocity <= x_max:
+                x += x_velocity
+                x_velocity -= 1
+                step += 1
+            ranges[xv_i] = (first_step, step if x_velocity > 0 else float("inf"))
+        return ranges
+
+    def __y_step_ranges(self, initial_pos: Point) -> dict[int, tuple[int, int]]:
+        """
+        Find the steps at which the y position is within the target area for
+        each initial y velocity, assuming the target area is below
+
+        Args:
+            initial_pos (Point): The initial position of the probe
+
+        Returns:
+            dict[int, tuple[int, int]]: The first and last step within the target
+                area by y velocity; velocities that miss the target area are left out
+        """
+        y_min = self.target_area.y_min - initial_pos.y
+        y_max = self.target_area.y_max - initial_pos.y
+        ranges = {}
+        for yv_i in range(y_min, 0):
+            y, y_velocity, step = 0, yv_i, 0
+            while y > y_max:
+                y += y_velocity
+                y_velocity -= 1
+                step += 1
+            if y < y_min:
+                continue
+            first_step = step
+            while y + y_velocity >= y_min:
+                y += y_velocity
+                y_velocity -= 1
+                step += 1
+            ranges[yv_i] = (first_step, step)
+        # a probe launched upward is back at its starting height after 2 * yv_i + 1
+        # steps, moving down at yv_i + 1, so it hits like that downward velocity
+        for yv_i in range(0, -y_min):
+            if -(yv_i + 1) in ranges:
+                first_step, last_step = ranges[-(yv_i + 1)]
+                ranges[yv_i] = (first_step + 2 * yv_i + 1, last_step + 2 * yv_i + 1)
+        return ranges
+
+    def __count_trajectories_analytic(self, initial_pos: Point) -> int:
+        """
+        Count the trajectories that hit the target area by pairing x and y
+        velocities that are within the target area at a common step
+
+        Only the velocities in the brute force range of "simulate" are counted,
+        so both methods give the same number from any initial position.
+
+        Args:
+            initial_pos (Point): The initial position of the probe
+
+        Returns:
+            int: The number of trajectories that will hit the target area
+        """
+        # set range based on the same assumptions from data as the brute force
+        start_x_velocity, end_x_velocity = initial_pos.x, self.target_area.x_max
+        end_y_velocity = max(abs(self.target_area.y_min), abs(self.target_area.y_max))
+        x_ranges = [
+            steps
+            for xv_i, steps in self.__x_step_ranges(initial_pos).items()
+            if start_x_velocity <= xv_i <= end_x_velocity
+        ]
+        y_ranges = [
+            steps
+            for yv_i, steps in self.__y_step_ranges(initial_pos).items()
+            if -end_y_velocity <= yv_i <= end_y_velocity
+        ]
+        x_first_steps = sorted(x_first for x_first, _ in x_ranges)
+        x_last_steps = sorted(x_last for _, x_last in x_ranges)
+        # the x ranges that overlap a y range are those starting before it ends,
+        # except those that also end before it starts
+        return sum(
+            bisect_right(x_first_steps, y_last) - bisect_left(x_last_steps, y_first)
+            for y_first, y_last in y_ranges
+        )
+
+
+class TrajectoryIndex:
+    """
+    Class for answering many target area queries from shared per-velocity tables
+
+    The x positions of every x velocity and the depths of every downward y velocity
+    are tabulated once by step, up to the given limits, so each target area is
+    answered with range lookups instead of simulating probes. The target areas
+    must be to the right of and below the initial position, and only the
+    velocities in the brute force range are counted, as for the "analytic"
+    method of `ProbeLauncher.count_trajectories`.
+    """
+
+    def __init__(self, x_limit: int, y_limit: int):
+        """
+        Args:
+            x_limit (int): The furthest x distance of any target area from the
+                initial position
+            y_limit (int): The furthest y distance of any target area from the
+                initial position
+        """
+        self.x_limit = x_limit
+        self.y_limit = y_limit
+        # x positions by step of each x velocity until it stops; the probe then
+        # stays at the triangular number of its velocity
+        self.x_positions = {
+            xv_i: [step * xv_i - step * (step - 1) // 2 for step in range(1, xv_i + 1)]
+            for xv_i in range(1, x_limit + 1)
+        }
+        # depths below the initial position by step of each downward y velocity,
+        # until the probe is past the limit
+        self.y_depths = {}
+        for yv_i in range(-y_limit, 0):
+            depths, depth, y_velocity = [], 0, -yv_i
+            while depth <= y_limit:
+                depth += y_velocity
+                y_velocity += 1
+                depths.append(depth)
+            self.y_depths[yv_i] = depths
+
+    def __relative_bounds(
+        self, target_area: TargetArea, initial_pos: Point
+    ) -> tuple[int, int, int, int]:
+        """Return the target area bounds as distances right of and below the initial position"""
+        x_min = target_area.x_min - initial_pos.x
+        x_max = target_area.x_max - initial_pos.x
+        depth_min = initial_pos.y - target_area.y_max
+        depth_max = initial_pos.y - target_area.y_min
+        if x_min <= 0 or depth_min <= 0:
+            raise ValueError("Target area must be to the right of and below the probe")
+        if x_max > self.x_limit or depth_max > self.y_limit:
+            raise ValueError("Target area is outside the limits of the index")
+        return x_min, x_max, depth_min, depth_max
+
+    def __x_step_ranges(self, x_min: int, x_max: int) -> dict[int, tuple[int, float]]:
+        """Return the first and last step within [x_min, x_max] of each x velocity that reaches it"""
+        ranges = {}
+        for xv_i in range(1, x_max + 1):
+            positions = self.x_positions[xv_i]
+            first_step = bisect_left(positions, x_min) + 1
+            last_step = bisect_right(positions, x_max)
+            if first_step > xv_i or first_step > last_step:
+                continue
+            ranges[xv_i] = (first_step, last_step if last_step < xv_i else float("inf"))
+        return ranges
+
+    def __y_step_ranges(
+        self, depth_min: int, depth_max: int
+    ) -> dict[int, tuple[int, int]]:
+        """Return the first and last step within [depth_min, depth_max] of each y velocity that reaches it"""
+        ranges = {}
+        for yv_i in range(-depth_max, 0):
+            depths = self.y_depths[yv_i]
+            first_step = bisect_left(depths, depth_min) + 1
+            last_step = bisect_right(depths, depth_max)
+            if first_step <= last_step:
+                ranges[yv_i] = (first_step, last_step)
+        # an upward velocity is back at the initial height after 2 * yv_i + 1 steps,
+        # moving down at yv_i + 1
+        for yv_i in range(0, depth_max):
+            if -(yv_i + 1) in ranges:
+                first_step, last_step = ranges[-(yv_i + 1)]
+                ranges[yv_i] = (first_step + 2 * yv_i + 1, last_step + 2 * yv_i + 1)
+        return ranges
+
+    def __step_ranges(
+        self, target_area: TargetArea, initial_pos: Point
+    ) -> tuple[dict[int, tuple[int, float]], dict[int, tuple[int, int]]]:
+        """Return the x and y step ranges of the velocities in the brute force range"""
+        x_min, x_max, depth_min, depth_max = self.__relative_bounds(
+            target_area, initial_pos
+        )
+        # set range based on the same assumptions from data as the brute force
+        start_x_velocity, end_x_velocity = initial_pos.x, target_area.x_max
+        end_y_velocity = max(abs(target_area.y_min), abs(target_area.y_max))
+        x_ranges = {
+            xv_i: steps
+            for xv_i, steps in self.__x_step_ranges(x_min, x_max).items()
+            if start_x_velocity <= xv_i <= end_x_velocity
+        }
+        y_ranges = {
+            yv_i: steps
+            for yv_i, steps in self.__y_step_ranges(depth_min, depth_max).items()
+            if -end_y_velocity <= yv_i <= end_y_velocity
+        }
+        return x_ranges, y_ranges
+
+    def count_trajectories(
+        self, target_area: TargetArea, initial_pos: Point = Point(0, 0)
+    ) -> int:
+        """
+        Count the number of trajectories that will hit the target area
+
+        Args:
+            target_area (TargetArea): The target area to hit
+            initial_pos (Point): The initial position of the probe
+
+        Returns:
+            int: The number of trajectories that will hit the target area
+        """
+        x_ranges, y_ranges = self.__step_ranges(target_area, initial_pos)
+        x_first_steps = sorted(x_first for x_first, _ in x_ranges.values())
+        x_last_steps = sorted(x_last for _, x_last in x_ranges.values())
+        return sum(
+            bisect_right(x_first_steps, y_last) - bisect_left(x_last_steps, y_first)
+            for y_first, y_last in y_ranges.values()
+        )
+
+    def best_trajectory(
+        self, target_area: TargetArea, initial_pos: Point = Point(0, 0)
+    ) -> Optional[tuple[Point, int]]:
+        """
+        Find the initial velocity that reaches the highest y position and still
+        hits the target area, preferring the lowest x velocity on ties
+
+        Args:
+            target_area (TargetArea): The target area to hit
+            initial_pos (Point): The initial position of the probe
+
+        Returns:
+            Optional[tuple[Point, int]]: The initial velocity and the maximum y
+                position reached by the probe, or None if no trajectory hits
+        """
+        x_ranges, y_ranges = self.__step_ranges(target_area, initial_pos)
+        for yv_i in sorted(y_ranges, reverse=True):
+            y_first, y_last = y_ranges[yv_i]
+            for xv_i, (x_first, x_last) in x_ranges.items():
+                if x_first <= y_last and y_first <= x_last:
+                    apex = yv_i * (yv_i + 1) // 2 if yv_i > 0 else 0
+                    return Point(xv_i, yv_i), initial_pos.y + apex
+        return None
+
 
 def main():
     with open(os.path.join(os.path.dirname(__file__), "input.txt")) as f:
@@ -153,7 +502,9 @@ def main():
 
     launcher = ProbeLauncher(target_area)
 
-    print(f"Number of successful trajectories: {launcher.count_trajectories()}")
+    count = launcher.count_trajectories(method="analytic")
+
+    print(f"Number of successful trajectories: {count}")
 
 
 if __name__ == "__main__":